@@ -0,0 +1,43 @@
+import os
+import sys
+import socket
+import typing as tp
+
+from pipeline.daemon_protocol import default_socket_path, receive_message, send_message
+
+
+def request_daemon(socket_path: str, argv: tp.List[str]) -> tp.Optional[int]:
+    """
+    Executes generation in daemon. Returns `None` if
+    daemon is not running or can't execute request.
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+            send_message(sock, {"argv": argv, "cwd": os.getcwd()})
+            response = receive_message(sock)
+    except OSError:
+        return None
+
+    if response is None or "error" in response:
+        return None
+
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    return response["exit_code"]
+
+
+def main(argv: tp.List[str]) -> int:
+    exit_code = request_daemon(default_socket_path(), argv)
+    if exit_code is not None:
+        return exit_code
+
+    # Heavy modules are imported only if daemon is not available
+    import main as codegen
+
+    codegen.main(codegen.parse_args(argv))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,10 +1,21 @@
-set(CODEGEN_SCRIPT_FILE ${CMAKE_CURRENT_LIST_DIR}/../main.py)
+# Paths of build-time generation depfile are transformed by CMake for Ninja
+if (POLICY CMP0116)
+  cmake_policy(SET CMP0116 NEW)
+endif()
+
+option(CPP_CODEGEN_USE_DAEMON "Send generation requests to running daemon.py, generate in-process if it's not running" OFF)
+
+if (CPP_CODEGEN_USE_DAEMON)
+  set(CODEGEN_SCRIPT_FILE ${CMAKE_CURRENT_LIST_DIR}/../client.py)
+else()
+  set(CODEGEN_SCRIPT_FILE ${CMAKE_CURRENT_LIST_DIR}/../main.py)
+endif()
 
 function(target_codegen)
   cmake_parse_arguments(
     ARGS
-    ""
-    "TARGET;CLANG_LIBRARY"
+    "BUILD_TIME"
+    "TARGET;CLANG_LIBRARY;OUTPUT_SHARDS;COMPILE_COMMANDS"
     ""
     ${ARGN}
   )
@@ -35,6 +46,11 @@ function(target_codegen)
     --ignore_path_glob ${CODEGEN_INCLUDE_DIR}/*
     --ignore_path_glob ${CODEGEN_SOURCE_DIR}/*
   )
+  # Build tree inside of project directory is not walked
+  if (NOT TARGET_BUILD_DIR STREQUAL TARGET_PROJECT_DIR)
+    list(APPEND CODEGEN_SCRIPT_ARGS --ignore_path_glob ${TARGET_BUILD_DIR}/*)
+  endif()
+
   foreach (TARGET_INCLUDE_DIR ${TARGET_INCLUDE_DIRS})
     list(APPEND CODEGEN_SCRIPT_ARGS --project_include_dir)
     list(APPEND CODEGEN_SCRIPT_ARGS ${TARGET_INCLUDE_DIR})
@@ -45,31 +61,123 @@ function(target_codegen)
     list(APPEND CODEGEN_SCRIPT_ARGS ${ARGS_CLANG_LIBRARY})
   endif()
 
-  execute_process(
-    COMMAND ${CODEGEN_SCRIPT_ARGS}
-    WORKING_DIRECTORY ${TARGET_PROJECT_DIR}
-    RESULT_VARIABLE EXIT_CODE
-    ERROR_VARIABLE ERROR_DATA
-  )
-
-  # list(JOIN CODEGEN_SCRIPT_ARGS " " COMMAND_STR)
-  # message(STATUS ${COMMAND_STR})
+  # Converters are compiled as a part of OUTPUT_SHARDS unity sources
+  if (NOT "${ARGS_OUTPUT_SHARDS}" STREQUAL "")
+    list(APPEND CODEGEN_SCRIPT_ARGS --output_shards)
+    list(APPEND CODEGEN_SCRIPT_ARGS ${ARGS_OUTPUT_SHARDS})
+  endif()
 
-  if (NOT ${EXIT_CODE} STREQUAL "0")
-    message(SEND_ERROR "Generator status code: ${EXIT_CODE}")
-    message(SEND_ERROR ${ERROR_DATA})
-    message(FATAL_ERROR "Unable to execute generator on '${ARGS_TARGET}' target")
+  # Compile commands are exported after configuration, so they are used only during build
+  if (NOT "${ARGS_COMPILE_COMMANDS}" STREQUAL "" AND NOT ARGS_BUILD_TIME)
+    message(FATAL_ERROR "COMPILE_COMMANDS requires BUILD_TIME")
   endif()
 
-  # Iterating new sources
-  file(GLOB_RECURSE SRC_FILES ${CODEGEN_SOURCE_DIR}/*.cpp)
-  target_sources(${ARGS_TARGET}
-    PRIVATE
-      ${SRC_FILES}
-  )
+  if (ARGS_BUILD_TIME)
+    _target_codegen_build_time(${ARGS_TARGET} "${CODEGEN_SCRIPT_ARGS}" "${ARGS_COMPILE_COMMANDS}")
+  else()
+    execute_process(
+      COMMAND ${CODEGEN_SCRIPT_ARGS}
+      WORKING_DIRECTORY ${TARGET_PROJECT_DIR}
+      RESULT_VARIABLE EXIT_CODE
+      ERROR_VARIABLE ERROR_DATA
+    )
+
+    # list(JOIN CODEGEN_SCRIPT_ARGS " " COMMAND_STR)
+    # message(STATUS ${COMMAND_STR})
+
+    if (NOT ${EXIT_CODE} STREQUAL "0")
+      message(SEND_ERROR "Generator status code: ${EXIT_CODE}")
+      message(SEND_ERROR ${ERROR_DATA})
+      message(FATAL_ERROR "Unable to execute generator on '${ARGS_TARGET}' target")
+    endif()
+
+    # Iterating new sources
+    file(GLOB_RECURSE SRC_FILES ${CODEGEN_SOURCE_DIR}/*.cpp)
+    target_sources(${ARGS_TARGET}
+      PRIVATE
+        ${SRC_FILES}
+    )
+  endif()
 
   target_include_directories(${ARGS_TARGET}
     PUBLIC
       ${CODEGEN_INCLUDE_DIR}
   )
 endfunction()
+
+# Generator is executed during build. List of generated files is known
+# only after generation, so it's executed once during configuration
+# (if list doesn't exist yet) and CMake is reconfigured when list changes.
+function(_target_codegen_build_time TARGET CODEGEN_SCRIPT_ARGS COMPILE_COMMANDS)
+  if (CMAKE_VERSION VERSION_LESS 3.20 AND NOT CMAKE_GENERATOR MATCHES "Ninja")
+    message(FATAL_ERROR "Build time code generation requires CMake 3.20 or Ninja generator")
+  endif()
+
+  get_target_property(TARGET_PROJECT_DIR ${TARGET} SOURCE_DIR)
+  get_target_property(TARGET_BUILD_DIR ${TARGET} BINARY_DIR)
+
+  set(CODEGEN_OUTPUT_LIST ${TARGET_BUILD_DIR}/${TARGET}_codegen_outputs.txt)
+  set(CODEGEN_STAMP ${TARGET_BUILD_DIR}/${TARGET}_codegen.stamp)
+  set(CODEGEN_DEPFILE ${TARGET_BUILD_DIR}/${TARGET}_codegen.d)
+
+  list(APPEND CODEGEN_SCRIPT_ARGS
+    --output_list ${CODEGEN_OUTPUT_LIST}
+    --stamp ${CODEGEN_STAMP}
+    --depfile ${CODEGEN_DEPFILE}
+  )
+
+  if (NOT EXISTS ${CODEGEN_OUTPUT_LIST})
+    execute_process(
+      COMMAND ${CODEGEN_SCRIPT_ARGS}
+      WORKING_DIRECTORY ${TARGET_PROJECT_DIR}
+      RESULT_VARIABLE EXIT_CODE
+      ERROR_VARIABLE ERROR_DATA
+    )
+
+    if (NOT ${EXIT_CODE} STREQUAL "0")
+      message(SEND_ERROR "Generator status code: ${EXIT_CODE}")
+      message(SEND_ERROR ${ERROR_DATA})
+      message(FATAL_ERROR "Unable to execute generator on '${TARGET}' target")
+    endif()
+  endif()
+
+  # Compile commands don't exist before the first configuration is finished,
+  # so files of configuration run above are selected without them
+  if (NOT "${COMPILE_COMMANDS}" STREQUAL "")
+    list(APPEND CODEGEN_SCRIPT_ARGS --compile_commands ${COMPILE_COMMANDS})
+  endif()
+
+  # New annotated enum adds output, so project has to be reconfigured
+  set_property(DIRECTORY APPEND PROPERTY CMAKE_CONFIGURE_DEPENDS ${CODEGEN_OUTPUT_LIST})
+  file(STRINGS ${CODEGEN_OUTPUT_LIST} CODEGEN_OUTPUTS)
+
+  # New project files are not listed in depfile yet
+  file(GLOB_RECURSE PROJECT_FILES CONFIGURE_DEPENDS
+    ${TARGET_PROJECT_DIR}/*.cpp
+    ${TARGET_PROJECT_DIR}/*.hpp
+  )
+  list(FILTER PROJECT_FILES EXCLUDE REGEX "^${TARGET_BUILD_DIR}/")
+
+  # Generated files are byproducts: generator rewrites only changed
+  # ones, so only they are recompiled.
+  add_custom_command(
+    OUTPUT ${CODEGEN_STAMP}
+    BYPRODUCTS ${CODEGEN_OUTPUTS} ${CODEGEN_OUTPUT_LIST}
+    COMMAND ${CODEGEN_SCRIPT_ARGS}
+    DEPENDS ${CODEGEN_SCRIPT_FILE} ${PROJECT_FILES}
+    DEPFILE ${CODEGEN_DEPFILE}
+    WORKING_DIRECTORY ${TARGET_PROJECT_DIR}
+    COMMENT "Generating code for '${TARGET}' target"
+    VERBATIM
+  )
+
+  add_custom_target(${TARGET}_codegen DEPENDS ${CODEGEN_STAMP})
+  add_dependencies(${TARGET} ${TARGET}_codegen)
+
+  set(CODEGEN_SOURCES ${CODEGEN_OUTPUTS})
+  list(FILTER CODEGEN_SOURCES INCLUDE REGEX "\\.cpp$")
+  target_sources(${TARGET}
+    PRIVATE
+      ${CODEGEN_SOURCES}
+  )
+endfunction()
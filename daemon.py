@@ -0,0 +1,187 @@
+import argparse
+import contextlib
+import io
+import logging
+import os
+import signal
+import socket
+import sys
+import traceback
+import typing as tp
+
+import main as codegen
+from pipeline.generation import Session, setup_clang_library
+from pipeline.daemon_protocol import default_socket_path, receive_message, send_message
+from pipeline.manifest import tool_fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args():
+    args = argparse.ArgumentParser(
+        description="Keeps libclang, compiled templates and parsed translation units "
+        "loaded between generation requests of `client.py`."
+    )
+
+    args.add_argument(
+        "--socket",
+        type=str,
+        default=default_socket_path(),
+        help="Path of unix socket to listen.",
+    )
+
+    args.add_argument(
+        "--clang_library",
+        type=str,
+        default=None,
+        help="Absolute path to system clang library. Requests can't change it.",
+    )
+
+    args.add_argument(
+        "--translation_units_cache",
+        type=int,
+        default=64,
+        help="Amount of parsed translation units kept in memory.",
+    )
+
+    args.add_argument(
+        "--idle_timeout",
+        type=float,
+        default=3600.0,
+        help="Daemon exits if there were no requests for this amount of seconds.",
+    )
+
+    return args.parse_args()
+
+
+class _StderrHandler(logging.Handler):
+    """
+    Writes records to current `sys.stderr`, so
+    logs of request are sent to client.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+
+    def emit(self, record: logging.LogRecord):
+        sys.stderr.write(self.format(record) + "\n")
+
+
+class Daemon:
+    def __init__(self, clang_library: tp.Optional[str], translation_units_cache: int):
+        setup_clang_library(clang_library)
+
+        self._clang_library = clang_library
+        self._session = Session(translation_units_cache)
+        self._fingerprint = tool_fingerprint()
+
+    @property
+    def is_stale(self) -> bool:
+        """
+        Generator sources were changed since daemon start.
+        """
+        return tool_fingerprint() != self._fingerprint
+
+    def execute(self, argv: tp.List[str], cwd: str) -> tp.Dict[str, tp.Any]:
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        exit_code = 0
+
+        previous_cwd = os.getcwd()
+        try:
+            os.chdir(cwd)
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                try:
+                    args = codegen.parse_args(argv)
+                    if args.clang_library not in (None, self._clang_library):
+                        raise RuntimeError(
+                            f"Daemon uses '{self._clang_library}' clang library, "
+                            f"'{args.clang_library}' is requested"
+                        )
+
+                    codegen.main(args, session=self._session)
+                except SystemExit as e:
+                    exit_code = e.code if isinstance(e.code, int) else 1
+                except Exception:
+                    traceback.print_exc()
+                    exit_code = 1
+        finally:
+            os.chdir(previous_cwd)
+
+        return {
+            "exit_code": exit_code,
+            "stdout": stdout.getvalue(),
+            "stderr": stderr.getvalue(),
+        }
+
+    def serve(self, socket_path: str, idle_timeout: float):
+        # Socket file may be left by killed daemon
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(socket_path)
+            except OSError:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(socket_path)
+            else:
+                raise RuntimeError(f"Daemon is already listening on '{socket_path}'")
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            server.bind(socket_path)
+            os.chmod(socket_path, 0o600)
+            server.listen()
+            server.settimeout(idle_timeout)
+
+            logger.info("Listening on '%s'", socket_path)
+
+            try:
+                while True:
+                    try:
+                        connection, _ = server.accept()
+                    except socket.timeout:
+                        logger.info("No requests for %s seconds, exiting", idle_timeout)
+                        return
+
+                    # Requests are handled one by one: libclang index
+                    # and generators are not thread safe.
+                    with connection:
+                        if not self._handle(connection):
+                            return
+            finally:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(socket_path)
+
+    def _handle(self, connection: socket.socket) -> bool:
+        """
+        Returns `False` if daemon has to exit.
+        """
+        request = receive_message(connection)
+        if request is None:
+            return True
+
+        # Code of running daemon differs from sources, client
+        # falls back to in-process execution.
+        if self.is_stale:
+            logger.info("Generator sources were changed, exiting")
+            send_message(connection, {"error": "Daemon is outdated"})
+            return False
+
+        logger.info("Executing request from '%s'", request["cwd"])
+        send_message(connection, self.execute(request["argv"], request["cwd"]))
+        return True
+
+
+def main(args):
+    logging.getLogger().handlers = [_StderrHandler()]
+
+    # Socket is removed on termination
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    Daemon(args.clang_library, args.translation_units_cache).serve(
+        args.socket,
+        args.idle_timeout,
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
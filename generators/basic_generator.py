@@ -1,5 +1,6 @@
 import abc
 import dataclasses
+import typing as tp
 
 import clang.cindex
 
@@ -8,14 +9,32 @@ import clang.cindex
 class FileInfo:
     project_include_dirs: str
     path: str
+    # Path of file relative to project include directory, that
+    # contains it. `None` if it can't be included.
+    include_path: tp.Optional[str] = None
 
 
 @dataclasses.dataclass()
 class GeneratingConfig:
-    pass
+    # Implementation of generated enum to value conversions.
+    # `switch` - `switch` statement or constexpr array for contiguous values
+    # `map` - function-local static `std::unordered_map`
+    conversion_backend: str = "switch"
+    # Implementation of generated value to enum conversions.
+    # `perfect_hash` - generated minimal perfect hash, falls back to
+    # `binary_search` if hash can't be built
+    # `binary_search` - binary search over sorted array
+    reverse_conversion_backend: str = "perfect_hash"
+    # Amount of unity sources, that include converter implementations.
+    # If zero, every implementation is a separate source.
+    output_shards: int = 0
 
 
 class BasicGenerator(abc.ABC):
+    # Kinds of nodes, handled by generator. Only annotated
+    # nodes of these kinds are passed to generator.
+    CURSOR_KINDS: tp.ClassVar[tp.FrozenSet[clang.cindex.CursorKind]] = frozenset()
+
     def __init__(
         self,
         include_path: str,
@@ -24,15 +43,31 @@ class BasicGenerator(abc.ABC):
         self._include_path: str = include_path
         self._source_path: str = source_path
 
+    def need_to_generate(self, node: clang.cindex.Cursor, raw_comment: str) -> bool:
+        """
+        Additional check of annotated node, which kind is
+        one of `CURSOR_KINDS`.
+        """
+        return True
+
     @abc.abstractmethod
-    def need_to_generate(self, node: clang.cindex.Cursor) -> bool:
+    def extract(self, node: clang.cindex.Cursor, raw_comment: str) -> tp.Any:
+        """
+        Converts cursor into lightweight picklable declaration.
+        Result of this method is passed to `generate`, so
+        cursors (and translation units) don't have to outlive parsing.
+        `raw_comment` is comment of node, fetched by walker.
+        """
         pass
 
     @abc.abstractmethod
     def generate(
         self,
-        node: clang.cindex.Cursor,
+        declaration: tp.Any,
         file_info: FileInfo,
         generating_config: GeneratingConfig,
-    ):
+    ) -> tp.List[str]:
+        """
+        Generates code for declaration. Returns paths of written files.
+        """
         pass
@@ -0,0 +1,135 @@
+import re
+import functools
+import typing as tp
+
+from pipeline.prefilter import CODEGEN_MARKER
+
+# Comments are parsed once per distinct text: enums, generated by
+# macros or scripts, repeat the same comments many times.
+_CACHE_SIZE = 65536
+
+_COMMENT_BEGIN_REGEX = re.compile(r"(\*|//<|//)\s*")
+# Lines without letters (`/**`, `*/`, separators) are skipped
+_LETTER_REGEX = re.compile(r"[^\W\d_]")
+
+# Conversion value entry: `"value"postfix`. Characters inside value
+# may be escaped with `\`, postfix lasts until space.
+_ENTRY_REGEX = re.compile(r' *"((?:[^"\\]|\\.)*)"([^ ]*)')
+_SPACES_REGEX = re.compile(r" *")
+
+
+class AnnotationError(RuntimeError):
+    pass
+
+
+# Text of comment line without comment prefix along with index of line
+# in comment and offset of text in line (both are zero based).
+CommentLine = tp.Tuple[int, int, str]
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def comment_lines(raw_comment: str) -> tp.Tuple[CommentLine, ...]:
+    result = []
+    for index, raw_line in enumerate(raw_comment.split("\n")):
+        line = raw_line.strip()
+        if _LETTER_REGEX.search(line) is None:
+            continue
+
+        offset = len(raw_line) - len(raw_line.lstrip())
+        prefix = _COMMENT_BEGIN_REGEX.match(line)
+        if prefix is not None:
+            line = line[prefix.end() :]
+            offset += prefix.end()
+
+        result.append((index, offset, line))
+
+    return tuple(result)
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def parse_converters(raw_comment: str) -> tp.FrozenSet[str]:
+    """
+    Activation strings, that follow `@cpp_codegen` line of enum comment.
+    """
+    converters = set()
+
+    mark_found = False
+    for _, _, line in comment_lines(raw_comment):
+        if mark_found:
+            converters.add(line)
+
+        if line == CODEGEN_MARKER:
+            mark_found = True
+
+    return frozenset(converters)
+
+
+def _unescape(value: str) -> str:
+    return value.replace("\\\\", "\\").replace('\\"', '"')
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def _parse_conversion_values(
+    raw_comment: str,
+) -> tp.Tuple[tp.Dict[str, str], tp.Optional[tp.Tuple[int, int, str]]]:
+    # Errors are returned instead of raised, so they are cached too.
+    # Location of error is relative to comment.
+    values: tp.Dict[str, str] = {}
+
+    lines = comment_lines(raw_comment)
+    for line_index, (index, offset, line) in enumerate(lines):
+        position = 0
+        while position < len(line):
+            entry = _ENTRY_REGEX.match(line, position)
+            if entry is None:
+                position = _SPACES_REGEX.match(line, position).end()
+                if position == len(line):
+                    break
+
+                if line[position] == '"':
+                    message = f"Value has not been closed with '\"' in comment '{line}'"
+                else:
+                    message = f"Unknown symbol '{line[position]}' in comment '{line}'"
+                return values, (index, offset + position, message)
+
+            if not entry.group(2):
+                # Value without postfix at the end of comment
+                # is ignored, as it always was
+                if entry.end() == len(line) and line_index == len(lines) - 1:
+                    break
+
+                return values, (
+                    index,
+                    offset + entry.end(),
+                    f"Postfix can not be empty in comment '{line}'",
+                )
+
+            values[entry.group(2)] = _unescape(entry.group(1))
+            position = entry.end()
+
+    return values, None
+
+
+def parse_conversion_values(
+    raw_comment: str,
+    path: str,
+    location: tp.Optional[tp.Tuple[int, int]] = None,
+) -> tp.Dict[str, str]:
+    """
+    Parses `"value"postfix` entries of enumerator comment into
+    postfix -> value mapping. `location` is line and column of
+    comment in `path` file, it's used to report errors.
+    """
+    values, error = _parse_conversion_values(raw_comment)
+    if error is None:
+        # Cached result is shared between callers
+        return dict(values)
+
+    index, offset, message = error
+    if location is None:
+        raise AnnotationError(f"{path}: {message}")
+
+    line, column = location
+    # Comment starts in the middle of its first line
+    column = column + offset if index == 0 else offset + 1
+    raise AnnotationError(f"{path}:{line + index}:{column}: {message}")
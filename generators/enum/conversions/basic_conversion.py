@@ -13,6 +13,8 @@ from generators.enum.enum_value_configuration import (
     EnumValueConfiguration,
     EnumConfiguration,
 )
+from generators.enum.conversions.perfect_hash import build_perfect_hash
+from generators.jinja_utils import load_template
 
 
 @dataclasses.dataclass()
@@ -23,6 +25,39 @@ class ConversionResults:
     required_source_includes: tp.Set[str]
 
 
+@dataclasses.dataclass()
+class LookupEntry:
+    enum_value: str
+    numeric_value: int
+    value: str
+
+
+@dataclasses.dataclass()
+class LookupTable:
+    # `array` - constexpr array, indexed by `numeric value - min_value`
+    # `switch` - `switch` statement over enum values
+    # `map` - function-local static `std::unordered_map`
+    backend: str
+    # Entries with unique numeric values
+    entries: tp.List[LookupEntry]
+    min_value: int
+
+
+@dataclasses.dataclass()
+class ReverseLookupTable:
+    # `perfect_hash` - `entries` are placed into perfect hash slots
+    # `binary_search` - `entries` are sorted by value
+    # `empty` - there are no entries
+    backend: str
+    entries: tp.List[LookupEntry]
+    # Perfect hash displacements (see `build_perfect_hash`)
+    displacements: tp.List[int]
+
+
+# Array index is calculated in `long long`
+_ARRAY_VALUE_LIMIT = 2**62
+
+
 class BasicConversion(abc.ABC):
     def __init__(self):
         pass
@@ -45,6 +80,109 @@ class BasicConversion(abc.ABC):
         pass
 
     @staticmethod
-    def _load_template(name: str):
-        with open(os.path.join(os.path.dirname(__file__), "templates", name), "r") as f:
-            return jinja2.Template(f.read())
+    def _build_lookup_table(
+        enum_values: tp.Dict[str, str],
+        enum_configuration: EnumConfiguration,
+        generating_config: GeneratingConfig,
+    ) -> LookupTable:
+        entries: tp.List[LookupEntry] = []
+        numeric_values: tp.Set[int] = set()
+        for enum_value, value in enum_values.items():
+            numeric_value = enum_configuration.numeric_values[enum_value]
+
+            # Enum values with the same numeric value are indistinguishable,
+            # the first declared one is used (as `std::unordered_map` did).
+            if numeric_value in numeric_values:
+                continue
+            numeric_values.add(numeric_value)
+
+            entries.append(
+                LookupEntry(
+                    enum_value=enum_value,
+                    numeric_value=numeric_value,
+                    value=value,
+                )
+            )
+
+        if generating_config.conversion_backend == "map":
+            return LookupTable(backend="map", entries=entries, min_value=0)
+
+        if entries:
+            min_value = min(numeric_values)
+            max_value = max(numeric_values)
+            if (
+                max_value - min_value + 1 == len(entries)
+                and -_ARRAY_VALUE_LIMIT < min_value
+                and max_value < _ARRAY_VALUE_LIMIT
+            ):
+                return LookupTable(
+                    backend="array",
+                    entries=sorted(entries, key=lambda entry: entry.numeric_value),
+                    min_value=min_value,
+                )
+
+        return LookupTable(backend="switch", entries=entries, min_value=0)
+
+    @staticmethod
+    def _build_reverse_lookup_table(
+        enum_values: tp.Dict[str, str],
+        enum_configuration: EnumConfiguration,
+        generating_config: GeneratingConfig,
+    ) -> ReverseLookupTable:
+        entries: tp.List[LookupEntry] = []
+        values: tp.Set[str] = set()
+        for enum_value, value in enum_values.items():
+            # The first enum value with such conversion value is used
+            if value in values:
+                continue
+            values.add(value)
+
+            entries.append(
+                LookupEntry(
+                    enum_value=enum_value,
+                    numeric_value=enum_configuration.numeric_values[enum_value],
+                    value=value,
+                )
+            )
+
+        if not entries:
+            return ReverseLookupTable(backend="empty", entries=[], displacements=[])
+
+        if generating_config.reverse_conversion_backend == "perfect_hash":
+            perfect_hash = build_perfect_hash(
+                [entry.value.encode("utf-8") for entry in entries]
+            )
+            if perfect_hash is not None:
+                return ReverseLookupTable(
+                    backend="perfect_hash",
+                    entries=[entries[key_index] for key_index in perfect_hash.slots],
+                    displacements=perfect_hash.displacements,
+                )
+
+        # `std::string_view` compares characters as unsigned ones,
+        # the same as python compares bytes.
+        return ReverseLookupTable(
+            backend="binary_search",
+            entries=sorted(entries, key=lambda entry: entry.value.encode("utf-8")),
+            displacements=[],
+        )
+
+    @staticmethod
+    def _required_reverse_lookup_includes(lookup: ReverseLookupTable) -> tp.Set[str]:
+        if lookup.backend == "perfect_hash":
+            return {"cstdint", "stdexcept"}
+        if lookup.backend == "binary_search":
+            return {"algorithm", "iterator", "stdexcept"}
+        return {"stdexcept"}
+
+    @staticmethod
+    def _required_lookup_includes(lookup: LookupTable) -> tp.Set[str]:
+        if lookup.backend == "map":
+            return {"unordered_map", "stdexcept"}
+        return {"stdexcept"}
+
+    @staticmethod
+    def _load_template(name: str) -> jinja2.Template:
+        # Templates are loaded on first use, so templates of
+        # conversions, that are not used, are never compiled
+        return load_template(os.path.join(os.path.dirname(__file__), "templates", name))
@@ -0,0 +1,55 @@
+import typing as tp
+
+from generators.basic_generator import (
+    FileInfo,
+    GeneratingConfig,
+)
+from generators.enum.enum_value_configuration import (
+    EnumConfiguration,
+)
+from generators.enum.conversions.basic_conversion import (
+    BasicConversion,
+    ConversionResults,
+)
+from generators.jinja_utils import to_cpp_str
+
+
+class FromStringConversion(BasicConversion):
+    NAME = "string_deserialization"
+    POSTFIX = "s"
+
+    HEADER_TEMPLATE = "from_string_header.jinja2"
+    SOURCE_TEMPLATE = "from_string_source.jinja2"
+    LOOKUP_TEMPLATE = "reverse_lookup.jinja2"
+
+    def convert(
+        self,
+        enum_values: tp.Dict[str, str],
+        enum_configuration: EnumConfiguration,
+        file_info: FileInfo,
+        generating_config: GeneratingConfig,
+    ) -> ConversionResults:
+        lookup = self._build_reverse_lookup_table(
+            enum_values,
+            enum_configuration,
+            generating_config,
+        )
+
+        render_data = {
+            "enum_values": enum_values,
+            "enum_data": enum_configuration,
+            "lookup": lookup,
+            "to_cpp_str": to_cpp_str,
+        }
+
+        return ConversionResults(
+            source_text=self._load_template(self.SOURCE_TEMPLATE).render(
+                lookup_code=self._load_template(self.LOOKUP_TEMPLATE).render(**render_data),
+                **render_data,
+            ),
+            header_text=self._load_template(self.HEADER_TEMPLATE).render(**render_data),
+            required_include_includes={
+                "string_view",
+            },
+            required_source_includes=self._required_reverse_lookup_includes(lookup),
+        )
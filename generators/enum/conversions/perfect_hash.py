@@ -0,0 +1,98 @@
+import dataclasses
+import typing as tp
+
+# 32 bit FNV-1a with murmur3 finalizer.
+# Generated C++ code uses exactly the same function.
+FNV_OFFSET_BASIS = 0x811C9DC5
+FNV_PRIME = 0x01000193
+
+# Maximum amount of seeds, tried for one bucket
+_MAX_BUCKET_SEED = 1 << 16
+
+
+def fnv1a(data: bytes, seed: int) -> int:
+    result = FNV_OFFSET_BASIS ^ seed
+    for byte in data:
+        result ^= byte
+        result = (result * FNV_PRIME) & 0xFFFFFFFF
+
+    # FNV-1a alone mixes last bytes and seed poorly, so keys, that
+    # differ only in them, collide for most of seeds
+    result ^= result >> 16
+    result = (result * 0x85EBCA6B) & 0xFFFFFFFF
+    result ^= result >> 13
+    result = (result * 0xC2B2AE35) & 0xFFFFFFFF
+    result ^= result >> 16
+    return result
+
+
+def reduce(hash_value: int, size: int) -> int:
+    # Maps hash to `[0, size)` without division
+    return (hash_value * size) >> 32
+
+
+@dataclasses.dataclass()
+class PerfectHash:
+    # Bucket index -> seed of second level hash. Negative value
+    # `-slot - 1` points directly to slot of single key bucket.
+    displacements: tp.List[int]
+    # Slot -> key index
+    slots: tp.List[int]
+
+
+def build_perfect_hash(keys: tp.List[bytes]) -> tp.Optional[PerfectHash]:
+    """
+    Builds minimal perfect hash ("hash, displace and compress")
+    for unique keys. Key is located in slot:
+    ```
+    d = displacements[reduce(fnv1a(key, 0), n)]
+    slot = -d - 1 if d < 0 else reduce(fnv1a(key, d), n)
+    ```
+    Returns `None` if hash can't be built.
+    """
+    keys_count = len(keys)
+    if keys_count == 0 or len(set(keys)) != keys_count:
+        return None
+
+    buckets: tp.List[tp.List[int]] = [[] for _ in range(keys_count)]
+    for key_index, key in enumerate(keys):
+        buckets[reduce(fnv1a(key, 0), keys_count)].append(key_index)
+
+    displacements = [0] * keys_count
+    slots: tp.List[tp.Optional[int]] = [None] * keys_count
+
+    # Placing buckets with collisions first, largest first
+    bucket_order = sorted(
+        range(keys_count), key=lambda bucket_index: -len(buckets[bucket_index])
+    )
+
+    single_key_buckets = []
+    for bucket_index in bucket_order:
+        bucket = buckets[bucket_index]
+        if len(bucket) <= 1:
+            if bucket:
+                single_key_buckets.append(bucket_index)
+            continue
+
+        for seed in range(1, _MAX_BUCKET_SEED):
+            positions = [
+                reduce(fnv1a(keys[key_index], seed), keys_count) for key_index in bucket
+            ]
+            if len(set(positions)) == len(positions) and all(
+                slots[position] is None for position in positions
+            ):
+                break
+        else:
+            return None
+
+        displacements[bucket_index] = seed
+        for key_index, position in zip(bucket, positions):
+            slots[position] = key_index
+
+    # Single key buckets are placed into free slots directly
+    free_slots = [slot for slot, key_index in enumerate(slots) if key_index is None]
+    for bucket_index, slot in zip(single_key_buckets, free_slots):
+        displacements[bucket_index] = -slot - 1
+        slots[slot] = buckets[bucket_index][0]
+
+    return PerfectHash(displacements=displacements, slots=slots)
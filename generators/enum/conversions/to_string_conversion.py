@@ -1,4 +1,3 @@
-import jinja2
 import typing as tp
 
 from generators.basic_generator import (
@@ -19,11 +18,8 @@ class ToStringConversion(BasicConversion):
     NAME = "string_serialization"
     POSTFIX = "s"
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-
-        self._header_template = self._load_template("to_string_header.jinja2")
-        self._source_template = self._load_template("to_string_source.jinja2")
+    HEADER_TEMPLATE = "to_string_header.jinja2"
+    SOURCE_TEMPLATE = "to_string_source.jinja2"
 
     def convert(
         self,
@@ -32,20 +28,24 @@ class ToStringConversion(BasicConversion):
         file_info: FileInfo,
         generating_config: GeneratingConfig,
     ) -> ConversionResults:
+        lookup = self._build_lookup_table(
+            enum_values,
+            enum_configuration,
+            generating_config,
+        )
+
         render_data = {
             "enum_values": enum_values,
             "enum_data": enum_configuration,
+            "lookup": lookup,
             "to_cpp_str": to_cpp_str,
         }
 
         return ConversionResults(
-            source_text=self._source_template.render(**render_data),
-            header_text=self._header_template.render(**render_data),
+            source_text=self._load_template(self.SOURCE_TEMPLATE).render(**render_data),
+            header_text=self._load_template(self.HEADER_TEMPLATE).render(**render_data),
             required_include_includes={
                 "string_view",
             },
-            required_source_includes={
-                "unordered_map",
-                "stdexcept",
-            },
+            required_source_includes=self._required_lookup_includes(lookup),
         )
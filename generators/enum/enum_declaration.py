@@ -0,0 +1,26 @@
+import dataclasses
+import typing as tp
+
+
+# Declarations are created for every annotated enum during parsing
+# and may be sent between processes, so they are kept compact.
+@dataclasses.dataclass()
+class EnumeratorDeclaration:
+    __slots__ = ("spelling", "value", "raw_comment", "comment_location")
+
+    spelling: str
+    value: int
+    raw_comment: tp.Optional[str]
+    # Line and column of comment, used to report annotation errors
+    comment_location: tp.Optional[tp.Tuple[int, int]]
+
+
+@dataclasses.dataclass()
+class EnumDeclaration:
+    __slots__ = ("spelling", "full_name", "namespace", "raw_comment", "enumerators")
+
+    spelling: str
+    full_name: tp.List[str]
+    namespace: tp.List[str]
+    raw_comment: str
+    enumerators: tp.List[EnumeratorDeclaration]
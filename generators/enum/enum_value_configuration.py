@@ -5,6 +5,7 @@ import typing as tp
 @dataclasses.dataclass()
 class EnumValueConfiguration:
     enum_value_name: str
+    numeric_value: int
     fallback_value: str
     conversion_values: tp.Dict[str, str]
 
@@ -13,3 +14,5 @@ class EnumValueConfiguration:
 class EnumConfiguration:
     typename: str
     namespace: tp.List[str]
+    # Enum value name -> numeric value
+    numeric_values: tp.Dict[str, int]
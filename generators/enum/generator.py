@@ -1,8 +1,5 @@
 import clang.cindex
-import re
-import dataclasses
 import typing as tp
-import enum
 import os
 
 import jinja2
@@ -12,61 +9,52 @@ from generators.basic_generator import (
     FileInfo,
     GeneratingConfig,
 )
+from generators.file_utils import write_if_changed
+from generators.jinja_utils import load_template
+from generators.enum.annotations import parse_conversion_values, parse_converters
 from generators.enum.conversions.basic_conversion import ConversionResults
 from generators.enum.conversions.to_string_conversion import ToStringConversion
 from generators.enum.conversions.to_json_conversion import ToJsonConversion
-
-# from generators.enum.conversions.to_json_conversion import ToJsonConversion
+from generators.enum.conversions.from_string_conversion import FromStringConversion
+from generators.enum.conversions.from_json_conversion import FromJsonConversion
+from generators.enum.enum_declaration import (
+    EnumDeclaration,
+    EnumeratorDeclaration,
+)
 from generators.enum.enum_value_configuration import (
     EnumValueConfiguration,
     EnumConfiguration,
 )
+from pipeline.profiling import span
+from pipeline.shards import FRAGMENT_EXTENSION
 
 
-@dataclasses.dataclass()
-class EnumConversionConfiguration:
-    converters: tp.Set[str]
-
-
-class ConversionEntryParseState(enum.Enum):
-    BEGIN = enum.auto()
-    VALUE = enum.auto()
-    POSTFIX = enum.auto()
+def _comment_location(cursor: clang.cindex.Cursor) -> tp.Optional[tp.Tuple[int, int]]:
+    # `clang_Cursor_getCommentRange` is not registered by python bindings
+    function = clang.cindex.conf.lib.clang_Cursor_getCommentRange
+    if function.argtypes is None:
+        function.argtypes = [clang.cindex.Cursor]
+        function.restype = clang.cindex.SourceRange
 
-
-@dataclasses.dataclass()
-class ConversionEntryContext:
-    state: ConversionEntryParseState
-    comment_line: str
-    symbol_index: int
-    result: tp.Dict[str, str]
-    value_cached: str = ""
+    start = function(cursor).start
+    if start.file is None:
+        return None
+    return start.line, start.column
 
 
 class EnumGenerator(BasicGenerator):
+    CURSOR_KINDS = frozenset({clang.cindex.CursorKind.ENUM_DECL})
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        self._header_template = self._load_template("header.jinja2")
-        self._source_template = self._load_template("source.jinja2")
-
-        self._comment_begin_regex = re.compile(r"^(\*|//<|//)\s*")
-
-        self._conversions = {
+        # List is used to keep converters order stable between runs
+        self._conversions = [
             ToStringConversion(),
             ToJsonConversion(),
-        }
-
-        self._conversion_entry_parse_states = {
-            ConversionEntryParseState.BEGIN: self._parse_conversion_entry_begin,
-            ConversionEntryParseState.VALUE: self._parse_conversion_entry_value,
-            ConversionEntryParseState.POSTFIX: self._parse_conversion_entry_postfix,
-        }
-
-    def need_to_generate(self, node: clang.cindex.Cursor) -> bool:
-        if node.kind == clang.cindex.CursorKind.ENUM_DECL:
-            return True
-        return False
+            FromStringConversion(),
+            FromJsonConversion(),
+        ]
 
     @staticmethod
     def _fetch_full_name(node: clang.cindex.Cursor):
@@ -92,241 +80,199 @@ class EnumGenerator(BasicGenerator):
 
         return list(reversed(result))
 
+    def extract(self, node: clang.cindex.Cursor, raw_comment: str) -> EnumDeclaration:
+        return EnumDeclaration(
+            spelling=node.spelling,
+            # This full name contains namespace and parent classes/structs.
+            full_name=self._fetch_full_name(node),
+            # Namespace without parent classes/structs
+            namespace=self._fetch_namespace(node),
+            raw_comment=raw_comment,
+            enumerators=[
+                self._extract_enumerator(child) for child in node.get_children()
+            ],
+        )
+
+    @staticmethod
+    def _extract_enumerator(node: clang.cindex.Cursor) -> EnumeratorDeclaration:
+        raw_comment = node.raw_comment
+        return EnumeratorDeclaration(
+            spelling=node.spelling,
+            value=node.enum_value,
+            raw_comment=raw_comment,
+            comment_location=_comment_location(node) if raw_comment is not None else None,
+        )
+
     def generate(
         self,
-        node: clang.cindex.Cursor,
+        declaration: EnumDeclaration,
         file_info: FileInfo,
         generating_config: GeneratingConfig,
-    ):
-        # Getting codegen config
-        config = self._codegen_configuration(node)
+    ) -> tp.List[str]:
+        with span(
+            "generate",
+            declaration="::".join(declaration.full_name),
+            file=file_info.path,
+        ):
+            return self._generate(declaration, file_info, generating_config)
+
+    def _generate(
+        self,
+        declaration: EnumDeclaration,
+        file_info: FileInfo,
+        generating_config: GeneratingConfig,
+    ) -> tp.List[str]:
+        # Getting enabled converters
+        converters = parse_converters(declaration.raw_comment)
 
         # Getting full enum name
-        # This full name contains namespace and parent classes/structs.
-        enum_full_name = self._fetch_full_name(node)
+        enum_full_name = declaration.full_name
 
         # Getting enum namespace (without parent classes/structs)
-        enum_namespace = self._fetch_namespace(node)
+        enum_namespace = declaration.namespace
 
         # Getting enum values + configs
-        enum_values = self._get_enum_values(node, enum_full_name)
+        enum_values = self._get_enum_values(declaration, enum_full_name, file_info)
 
         # Getting enum config
         enum_config = EnumConfiguration(
             typename="::".join(enum_full_name),
             namespace=enum_namespace,
+            numeric_values={
+                value.enum_value_name: value.numeric_value for value in enum_values
+            },
         )
 
-        results: tp.List[ConversionResults] = []
+        results: tp.List[tp.Tuple[str, ConversionResults]] = []
         for converter in self._conversions:
-            if converter.name not in config.converters:
+            if converter.name not in converters:
                 continue
 
             # Rebuilding mappings
-            results.append(
-                converter.convert(
-                    enum_values={
-                        value.enum_value_name: value.conversion_values.get(
-                            converter.value_postfix,
-                            value.fallback_value,
-                        )
-                        for value in enum_values
-                    },
-                    enum_configuration=enum_config,
-                    file_info=file_info,
-                    generating_config=generating_config,
-                )
-            )
-
-        include_includes = {
-            val for result in results for val in result.required_include_includes
-        }
-
-        source_includes = {
-            val for result in results for val in result.required_source_includes
-        }
-
-        enum_file_include = None
-        for include_dir in file_info.project_include_dirs:
-            if (
-                os.path.commonpath(
+            with span(
+                "render",
+                declaration=enum_config.typename,
+                conversion=converter.name,
+            ):
+                results.append(
                     (
-                        file_info.path,
-                        include_dir,
+                        converter.name,
+                        converter.convert(
+                            enum_values={
+                                value.enum_value_name: value.conversion_values.get(
+                                    converter.value_postfix,
+                                    value.fallback_value,
+                                )
+                                for value in enum_values
+                            },
+                            enum_configuration=enum_config,
+                            file_info=file_info,
+                            generating_config=generating_config,
+                        ),
                     )
                 )
-                != "/"
-            ):
-                enum_file_include = os.path.relpath(file_info.path, include_dir)
+
+        # Sorting includes to get reproducible output
+        source_includes = sorted(
+            {val for _, result in results for val in result.required_source_includes}
+        )
+
+        enum_file_include = file_info.include_path
 
         if enum_file_include is None:
             raise RuntimeError(
                 f"Unable to find include directory of '{file_info.path}' source file"
             )
 
-        hpp_other_file = os.path.join("converters", f"{node.spelling}.hpp")
+        hpp_other_file = os.path.join("converters", f"{declaration.spelling}.hpp")
 
         include_path = os.path.join(
             self._include_path,
             hpp_other_file,
         )
 
+        # Sharded implementations are compiled as a part of unity sources
+        source_extension = FRAGMENT_EXTENSION if generating_config.output_shards else ".cpp"
+
         source_path = os.path.join(
             self._source_path,
             "converters",
-            f"{node.spelling}.cpp",
+            f"{declaration.spelling}{source_extension}",
         )
 
         os.makedirs(os.path.dirname(include_path), exist_ok=True)
         os.makedirs(os.path.dirname(source_path), exist_ok=True)
 
-        with open(include_path, "w") as f:
-            f.write(
-                self._header_template.render(
+        # Every conversion is declared in its own header, so file, that uses
+        # only `to_string`, doesn't include headers of JSON conversions
+        converter_headers = []
+        converter_header_paths = []
+        for name, result in results:
+            converter_header = os.path.join("converters", declaration.spelling, f"{name}.hpp")
+            converter_header_path = os.path.join(self._include_path, converter_header)
+            os.makedirs(os.path.dirname(converter_header_path), exist_ok=True)
+
+            write_if_changed(
+                converter_header_path,
+                self._load_template("header.jinja2").render(
                     enum_file=enum_file_include,
-                    includes=include_includes,
-                    converters=[result.header_text for result in results],
-                )
-            )
-
-        with open(source_path, "w") as f:
-            f.write(
-                self._source_template.render(
-                    other_file=hpp_other_file,
-                    includes=source_includes,
-                    converters=[result.source_text for result in results],
-                )
-            )
-
-    @staticmethod
-    def _parse_conversion_entry_begin(ctx: ConversionEntryContext):
-        while ctx.symbol_index < len(ctx.comment_line):
-            if ctx.comment_line[ctx.symbol_index] == '"':
-                ctx.symbol_index += 1
-                ctx.state = ConversionEntryParseState.VALUE
-                break
-            elif ctx.comment_line[ctx.symbol_index] == " ":
-                ctx.symbol_index += 1
-                continue
-            raise RuntimeError(
-                f"Unknown symbol at index {ctx.symbol_index} of comment '{ctx.comment_line}'"
+                    includes=sorted(result.required_include_includes),
+                    converters=[result.header_text],
+                ),
             )
 
-    @staticmethod
-    def _parse_conversion_entry_value(ctx: ConversionEntryContext):
-        value_start_index = ctx.symbol_index
-        while ctx.symbol_index < len(ctx.comment_line):
-            # Processing escaping
-            if ctx.comment_line[ctx.symbol_index] == "\\":
-                ctx.symbol_index += 1
-            elif ctx.comment_line[ctx.symbol_index] == '"':
-                ctx.value_cached = (
-                    ctx.comment_line[value_start_index : ctx.symbol_index]
-                    .replace("\\\\", "\\")
-                    .replace('\\"', '"')
-                )
-                ctx.symbol_index += 1
-                ctx.state = ConversionEntryParseState.POSTFIX
-                return
+            converter_headers.append(converter_header)
+            converter_header_paths.append(converter_header_path)
 
-            ctx.symbol_index += 1
-
-        raise RuntimeError(
-            f"Value has not been closed with '\"' in comment '{ctx.comment_line}'"
+        write_if_changed(
+            include_path,
+            self._load_template("header.jinja2").render(
+                enum_file=enum_file_include,
+                includes=converter_headers,
+                converters=[],
+            ),
         )
 
-    @staticmethod
-    def _parse_conversion_entry_postfix(ctx: ConversionEntryContext):
-        postfix_start_index = ctx.symbol_index
-        while ctx.symbol_index < len(ctx.comment_line):
-            if ctx.comment_line[ctx.symbol_index] == " ":
-                break
-            ctx.symbol_index += 1
-
-        if postfix_start_index == ctx.symbol_index:
-            raise RuntimeError(
-                f"Postfix can not be empty in comment '{ctx.comment_line}"
-            )
-        ctx.result[
-            ctx.comment_line[postfix_start_index : ctx.symbol_index]
-        ] = ctx.value_cached
-        ctx.value_cached = ""
-        ctx.state = ConversionEntryParseState.BEGIN
-
-    def _parse_conversion_entries(self, lines: tp.List[str]) -> tp.Dict[str, str]:
-        ctx = ConversionEntryContext(
-            state=ConversionEntryParseState.BEGIN,
-            comment_line="",
-            symbol_index=0,
-            result=dict(),
+        write_if_changed(
+            source_path,
+            self._load_template("source.jinja2").render(
+                other_file=hpp_other_file,
+                includes=source_includes,
+                converters=[result.source_text for _, result in results],
+            ),
         )
-        for line in lines:
-            ctx.comment_line = line
-            ctx.symbol_index = 0
-
-            while ctx.symbol_index < len(ctx.comment_line):
-                self._conversion_entry_parse_states[ctx.state](ctx)
 
-        return ctx.result
+        return [include_path, *converter_header_paths, source_path]
 
     def _get_enum_values(
         self,
-        node: clang.cindex.Cursor,
+        declaration: EnumDeclaration,
         full_type_name: tp.List[str],
+        file_info: FileInfo,
     ) -> tp.List[EnumValueConfiguration]:
-        children = node.get_children()
-
         result: tp.List[EnumValueConfiguration] = list()
-        for child in children:
+        for child in declaration.enumerators:
             enum_value_name = f"{'::'.join(full_type_name)}::{child.spelling}"
 
             # Parsing raw comment if presented
-            comment_lines = self._parse_raw_comment(child.raw_comment)
             entries = {}
-            if comment_lines:
-                entries = self._parse_conversion_entries(comment_lines)
+            if child.raw_comment is not None:
+                entries = parse_conversion_values(
+                    child.raw_comment,
+                    file_info.path,
+                    child.comment_location,
+                )
 
             result.append(
                 EnumValueConfiguration(
                     enum_value_name=enum_value_name,
+                    numeric_value=child.value,
                     fallback_value=child.spelling,
                     conversion_values=entries,
                 )
             )
         return result
 
-    def _parse_raw_comment(self, comment):
-        if comment is None:
-            return None
-        return list(
-            map(
-                lambda line: self._comment_begin_regex.sub("", line),
-                filter(
-                    lambda line: any(map(lambda ch: ch.isalpha(), line)),
-                    [line.strip() for line in comment.split("\n")],
-                ),
-            )
-        )
-
-    def _codegen_configuration(
-        self, node: clang.cindex.Cursor
-    ) -> EnumConversionConfiguration:
-        # Filtering enum comment
-        lines = self._parse_raw_comment(node.raw_comment)
-
-        converters = set()
-
-        mark_found = False
-        for line in lines:
-            if mark_found:
-                converters.add(line)
-
-            if line == "@cpp_codegen":
-                mark_found = True
-
-        return EnumConversionConfiguration(converters=converters)
-
     @staticmethod
-    def _load_template(name: str):
-        with open(os.path.join(os.path.dirname(__file__), "templates", name), "r") as f:
-            return jinja2.Template(f.read())
+    def _load_template(name: str) -> jinja2.Template:
+        return load_template(os.path.join(os.path.dirname(__file__), "templates", name))
@@ -0,0 +1,38 @@
+import os
+
+from pipeline.profiling import span
+
+
+def write_if_changed(path: str, content: str) -> bool:
+    """
+    Writes `content` to `path` only if file content differs, so
+    modification time of unchanged files is preserved and build
+    system doesn't rebuild them. Content is written into temporary
+    file that replaces target one, so interrupted write never leaves
+    partially written file.
+
+    Returns `True` if file was written.
+    """
+    with span("write", path=path):
+        return _write_if_changed(path, content)
+
+
+def _write_if_changed(path: str, content: str) -> bool:
+    try:
+        with open(path, "r") as f:
+            if f.read() == content:
+                return False
+    except (FileNotFoundError, UnicodeDecodeError):
+        pass
+
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "w") as f:
+            f.write(content)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return True
@@ -1,9 +1,25 @@
+import os
 import re
 import json
+import hashlib
+import functools
+import typing as tp
+
+import jinja2
 
 CAMEL_TO_SNAKE_RE_1 = re.compile("(.)([A-Z][a-z]+)")
 CAMEL_TO_SNAKE_RE_2 = re.compile("([a-z0-9])([A-Z])")
 
+# Templates are loaded by path relative to this directory
+TEMPLATES_ROOT = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_EXTENSION = "jinja2"
+
+_PRECOMPILED_FINGERPRINT_FILE = "fingerprint"
+
+# Environment shared by all generators. Created on first use.
+_ENVIRONMENT: tp.Optional[jinja2.Environment] = None
+
+
 # taken from https://stackoverflow.com/a/1176023
 def camel_to_snake(name):
     name = CAMEL_TO_SNAKE_RE_1.sub(r"\1_\2", name)
@@ -12,3 +28,83 @@ def camel_to_snake(name):
 
 def to_cpp_str(content):
     return json.dumps(content)
+
+
+def _bytecode_cache() -> tp.Optional[jinja2.BytecodeCache]:
+    # Compiled templates are stored in per-user temporary directory
+    # and are reused by next processes, unless template changes.
+    try:
+        return jinja2.FileSystemBytecodeCache()
+    except (OSError, RuntimeError):
+        return None
+
+
+def template_environment() -> jinja2.Environment:
+    global _ENVIRONMENT
+    if _ENVIRONMENT is None:
+        _ENVIRONMENT = jinja2.Environment(
+            loader=jinja2.FileSystemLoader(TEMPLATES_ROOT),
+            bytecode_cache=_bytecode_cache(),
+            # Templates don't change while generator is running
+            auto_reload=False,
+        )
+    return _ENVIRONMENT
+
+
+def load_template(path: str) -> jinja2.Template:
+    """
+    Loads template by absolute path. Template is compiled
+    once per process and then taken from environment cache.
+    """
+    return template_environment().get_template(_template_name(path))
+
+
+@functools.lru_cache(maxsize=None)
+def _template_name(path: str) -> str:
+    return os.path.relpath(path, TEMPLATES_ROOT).replace(os.sep, "/")
+
+
+def _templates_fingerprint() -> str:
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(jinja2.__version__.encode())
+    for name in jinja2.FileSystemLoader(TEMPLATES_ROOT).list_templates():
+        if not name.endswith(f".{TEMPLATE_EXTENSION}"):
+            continue
+        hasher.update(name.encode())
+        with open(os.path.join(TEMPLATES_ROOT, name), "rb") as f:
+            hasher.update(f.read())
+    return hasher.hexdigest()
+
+
+def use_precompiled_templates(directory: str):
+    """
+    Makes shared environment load templates from python modules
+    in `directory`. Templates are compiled into it if directory
+    doesn't contain modules of current templates.
+    """
+    global _ENVIRONMENT
+
+    fingerprint = _templates_fingerprint()
+    fingerprint_path = os.path.join(directory, _PRECOMPILED_FINGERPRINT_FILE)
+
+    try:
+        with open(fingerprint_path, "r") as f:
+            up_to_date = f.read() == fingerprint
+    except FileNotFoundError:
+        up_to_date = False
+
+    if not up_to_date:
+        os.makedirs(directory, exist_ok=True)
+        jinja2.Environment(loader=jinja2.FileSystemLoader(TEMPLATES_ROOT)).compile_templates(
+            directory,
+            extensions=[TEMPLATE_EXTENSION],
+            zip=None,
+            ignore_errors=False,
+        )
+        with open(fingerprint_path, "w") as f:
+            f.write(fingerprint)
+
+    _ENVIRONMENT = jinja2.Environment(
+        loader=jinja2.ModuleLoader(directory),
+        auto_reload=False,
+    )
@@ -0,0 +1,94 @@
+import inspect
+import functools
+import importlib.metadata
+import typing as tp
+
+import clang.cindex
+
+from generators.basic_generator import BasicGenerator
+from generators.enum.generator import EnumGenerator
+
+# Entry point group of third-party generators. Entry point
+# has to reference `BasicGenerator` subclass, for example
+#
+#   [project.entry-points."cpp_codegen.generators"]
+#   struct = "my_package.struct_generator:StructGenerator"
+ENTRY_POINT_GROUP = "cpp_codegen.generators"
+
+_BUILTIN_GENERATORS: tp.Dict[str, tp.Type[BasicGenerator]] = {
+    "enum": EnumGenerator,
+}
+
+
+def _entry_points() -> tp.List[importlib.metadata.EntryPoint]:
+    entry_points = importlib.metadata.entry_points()
+    # `select` was added in python 3.10
+    if hasattr(entry_points, "select"):
+        return list(entry_points.select(group=ENTRY_POINT_GROUP))
+    return list(entry_points.get(ENTRY_POINT_GROUP, []))
+
+
+@functools.lru_cache(maxsize=None)
+def _plugin_generators() -> tp.Tuple[tp.Tuple[str, tp.Type[BasicGenerator]], ...]:
+    result = []
+    for entry_point in sorted(_entry_points(), key=lambda entry_point: entry_point.name):
+        if entry_point.name in _BUILTIN_GENERATORS:
+            raise RuntimeError(
+                f"Generator '{entry_point.value}' uses name of builtin generator '{entry_point.name}'"
+            )
+
+        generator_class = entry_point.load()
+        if not (
+            inspect.isclass(generator_class) and issubclass(generator_class, BasicGenerator)
+        ):
+            raise RuntimeError(
+                f"Generator '{entry_point.value}' is not a subclass of BasicGenerator"
+            )
+
+        if not generator_class.CURSOR_KINDS:
+            raise RuntimeError(f"Generator '{entry_point.value}' does not declare CURSOR_KINDS")
+
+        result.append((entry_point.name, generator_class))
+
+    return tuple(result)
+
+
+def generator_classes() -> tp.Dict[str, tp.Type[BasicGenerator]]:
+    """
+    Builtin and third-party generators by name. Order is
+    stable between runs: builtin generators go first,
+    third-party generators are sorted by name.
+    """
+    return {**_BUILTIN_GENERATORS, **dict(_plugin_generators())}
+
+
+def plugin_source_files() -> tp.List[str]:
+    """
+    Source files of third-party generators. Changing them
+    invalidates generated files just like changing sources
+    of builtin generators.
+    """
+    return sorted(
+        {inspect.getsourcefile(generator_class) for _, generator_class in _plugin_generators()}
+    )
+
+
+def create_generators(generator_config: tp.Dict[str, tp.Any]) -> tp.List[BasicGenerator]:
+    return [
+        generator_class(**generator_config)
+        for generator_class in generator_classes().values()
+    ]
+
+
+def index_by_kind(
+    generators: tp.List[BasicGenerator],
+) -> tp.Dict[clang.cindex.CursorKind, tp.List[tp.Tuple[int, BasicGenerator]]]:
+    """
+    Cursor kind -> generators (with their indices), that handle it.
+    """
+    result: tp.Dict[clang.cindex.CursorKind, tp.List[tp.Tuple[int, BasicGenerator]]] = {}
+    for generator_index, generator in enumerate(generators):
+        for kind in generator.CURSOR_KINDS:
+            result.setdefault(kind, list()).append((generator_index, generator))
+
+    return result
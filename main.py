@@ -1,19 +1,13 @@
 import argparse
 import sys
 import os
-import logging
-import dataclasses
 import typing as tp
-import fnmatch
 
-import alive_progress
-import clang.cindex
+from pipeline import stamp
+from pipeline.prefilter import CODEGEN_MARKER
 
-from generators.basic_generator import BasicGenerator, FileInfo, GeneratingConfig
-from generators.enum.generator import EnumGenerator
-
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+# Heavy modules (libclang bindings, jinja2, generators) are imported
+# only if generation is required, see `main`.
 
 
 def existing_dir(val: str):
@@ -27,7 +21,18 @@ def namespace(val: str):
     return val.split(".")
 
 
-def parse_args():
+def jobs_count(val: str):
+    result = int(val)
+    if result < 0:
+        raise ValueError(f"Jobs count can not be negative, got {result}")
+
+    if result == 0:
+        return os.cpu_count() or 1
+
+    return result
+
+
+def parse_args(argv: tp.Optional[tp.List[str]] = None):
     args = argparse.ArgumentParser()
 
     args.add_argument(
@@ -73,145 +78,181 @@ def parse_args():
         help="File globs that should be excluded from project parsing. For example `test_*.cpp`.",
     )
 
+    args.add_argument(
+        "--compile_commands",
+        type=existing_dir,
+        default=None,
+        help="Path to `compile_commands.json` (or directory, that contains it), exported by build system. Only sources, that have compile command, are parsed, with include paths and defines of their commands. Headers are parsed with command of source, that includes them.",
+    )
+
+    args.add_argument(
+        "--persist_file_index",
+        action="store_true",
+        help="Keep listings of project directories in `--output_source_dir` and reuse them for directories, that were not modified.",
+    )
+
     args.add_argument(
         "--clang_library",
         type=existing_dir,
         help="Absolute path to system clang library. If script will not be able to locate library by itself you may provide this argument.",
     )
 
-    return args.parse_args()
+    args.add_argument(
+        "--conversion_backend",
+        choices=["switch", "map"],
+        default="switch",
+        help="Implementation of generated enum conversions. `switch` generates `switch` statement (or constexpr array for contiguous enum values), `map` generates static `std::unordered_map`.",
+    )
+
+    args.add_argument(
+        "--reverse_conversion_backend",
+        choices=["perfect_hash", "binary_search"],
+        default="perfect_hash",
+        help="Implementation of generated conversions to enum. `perfect_hash` generates minimal perfect hash of values (falls back to `binary_search` if it can't be built), `binary_search` generates binary search over sorted values.",
+    )
+
+    args.add_argument(
+        "--output_shards",
+        type=int,
+        default=0,
+        help="Amount of unity sources `shard_XX.cpp`, that include converter implementations (`.ipp` files). `0` means that every implementation is a separate source.",
+    )
+
+    args.add_argument(
+        "--parse_function_bodies",
+        action="store_true",
+        help="Parse function bodies. By default they are skipped, since annotated declarations can't be located there.",
+    )
 
+    args.add_argument(
+        "--parse_complete",
+        action="store_true",
+        help="Parse files as complete translation units. By default files are parsed as incomplete ones, which is cheaper for headers.",
+    )
 
-@dataclasses.dataclass()
-class GeneratingInfo:
-    translation_unit: clang.cindex.TranslationUnit
-    generator_nodes: tp.Dict[BasicGenerator, tp.List[clang.cindex.Cursor]]
-    namespace: tp.List[str]
-    file_info: FileInfo
+    args.add_argument(
+        "--precompiled_preamble",
+        action="store_true",
+        help="Precompile translation unit preamble to speed up reparsing of the same file.",
+    )
 
+    args.add_argument(
+        "--clang_arg",
+        type=str,
+        action="append",
+        help="Additional argument for clang parser. Can be declared multiple times. For example `--clang_arg=-DSOME_DEFINE`.",
+    )
 
-def visit_ast(
-    cursor: clang.cindex.Cursor,
-    func: tp.Callable[[clang.cindex.Cursor], None],
-):
-    nodes_to_parse: tp.List[clang.cindex.Cursor] = [cursor]
+    args.add_argument(
+        "--force_regenerate",
+        action="store_true",
+        help="Ignore generation manifest and regenerate all files.",
+    )
+
+    args.add_argument(
+        "--disable_prefilter",
+        action="store_true",
+        help=f"Parse all files, including ones without `{CODEGEN_MARKER}` text. Required if enums are annotated through macros.",
+    )
+
+    args.add_argument(
+        "--profile",
+        type=str,
+        default=None,
+        help="Writes timings of discovery, parsing, traversal, generation and file writes "
+        "to file in Chrome trace event format and prints summary with the slowest files and declarations.",
+    )
+
+    args.add_argument(
+        "--jobs",
+        type=jobs_count,
+        default=1,
+        help="Amount of worker processes used to parse files. `0` means amount of available CPUs.",
+    )
 
-    while nodes_to_parse:
-        current_node = nodes_to_parse.pop(0)
+    args.add_argument(
+        "--precompiled_templates",
+        type=str,
+        default=None,
+        help="Directory for templates, precompiled into python modules. Templates are compiled into it "
+        "on first run and after templates change.",
+    )
 
-        func(current_node)
+    args.add_argument(
+        "--output_list",
+        type=str,
+        default=None,
+        help="Writes paths of all generated files to this file, one per line. "
+        "File is modified only if list changes.",
+    )
 
-        nodes_to_parse += current_node.get_children()
+    args.add_argument(
+        "--stamp",
+        type=str,
+        default=None,
+        help="File, that is touched after successful generation.",
+    )
 
+    args.add_argument(
+        "--depfile",
+        type=str,
+        default=None,
+        help="Writes Make/Ninja depfile, that declares `--stamp` file dependent on every parsed file "
+        "and every header, included by them.",
+    )
 
-def main(args):
-    logger.info("Creating generators")
+    args.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and regenerate files after every change of project files. Parsed translation units are kept in memory, so only changed files and files, that include them, are reparsed.",
+    )
 
-    if args.clang_library is not None:
-        clang.cindex.Config.library_file = args.clang_library
+    args.add_argument(
+        "--watch_poll_interval",
+        type=float,
+        default=None,
+        help="Check project files for changes every this amount of seconds in `--watch` mode instead of using inotify.",
+    )
 
-    generator_config = {
-        "include_path": args.output_include_dir,
-        "source_path": args.output_source_dir,
-    }
+    parsed_args = args.parse_args(argv)
+    if parsed_args.depfile is not None and parsed_args.stamp is None:
+        args.error("--depfile requires --stamp")
+    if parsed_args.output_shards < 0:
+        args.error("--output_shards can't be negative")
+    if parsed_args.watch_poll_interval is not None and parsed_args.watch_poll_interval <= 0:
+        args.error("--watch_poll_interval must be positive")
 
-    generators: tp.List[BasicGenerator] = [
-        EnumGenerator(**generator_config),
-    ]
-    logger.info("Created %d generators", len(generators))
+    return parsed_args
 
-    index = clang.cindex.Index.create()
 
-    files_to_proceed = {
-        os.path.join(dirpath, filename)
-        for dirpath, dirnames, filenames in os.walk(args.project_dir)
-        for filename in filenames
-        if os.path.splitext(filename)[1] in {".cpp", ".hpp"}
-        if not any(
-            (
-                fnmatch.fnmatch(os.path.join(dirpath, filename), pattern)
-                for pattern in args.ignore_path_glob
-            )
-        )
-    }
-
-    logger.info("Found %d files to proceed", len(files_to_proceed))
-
-    generating_infos: tp.List[GeneratingInfo] = []
-
-    with alive_progress.alive_bar(
-        len(files_to_proceed),
-        title="Parsing to AST",
-    ) as progress:
-        for file_path in files_to_proceed:
-            progress.text = os.path.basename(file_path)
-            tu = index.parse(
-                file_path,
-                [
-                    "-fparse-all-comments",
-                ],
-            )
-
-            applicable_generators = {}
-
-            def node_processor(node: clang.cindex.Cursor):
-                for generator in generators:
-                    node_comment = node.raw_comment
-                    if node_comment is None:
-                        continue
-
-                    if "@cpp_codegen" not in node_comment:
-                        continue
-
-                    if generator.need_to_generate(node):
-                        applicable_generators.setdefault(generator, list()).append(node)
-
-            visit_ast(tu.cursor, node_processor)
-
-            if applicable_generators:
-                generating_infos.append(
-                    GeneratingInfo(
-                        translation_unit=tu,
-                        generator_nodes=applicable_generators,
-                        namespace=args.namespace,
-                        file_info=FileInfo(
-                            project_include_dirs=args.project_include_dir,
-                            path=file_path,
-                        ),
-                    )
-                )
-
-            progress()
-
-    # Calculating total amount of nodes to proceed
-    # (just for progress bar)
-    total_nodes = sum(
-        (
-            len(nodes)
-            for info in generating_infos
-            for generator, nodes in info.generator_nodes.items()
+def main(
+    args,
+    profiler=None,
+    session=None,
+):
+    if args.watch:
+        from pipeline.watch import watch
+
+        watch(args, profiler)
+        return
+
+    # Most of runs don't change anything, so inputs are checked
+    # before heavy modules are imported
+    if (
+        not args.force_regenerate
+        and args.profile is None
+        and stamp.is_up_to_date(
+            os.path.join(args.output_source_dir, stamp.STAMP_FILE_NAME),
+            stamp.make_key(args),
         )
-    )
+    ):
+        if args.stamp is not None:
+            stamp.touch(args.stamp)
+        return
+
+    from pipeline.generation import generate
 
-    # Generating
-    with alive_progress.alive_bar(
-        total_nodes,
-        title="Generating",
-    ) as progress:
-        for info in generating_infos:
-            for generator, nodes in info.generator_nodes.items():
-                for node in nodes:
-                    progress.text = f"{generator.__class__.__name__}({node.spelling})"
-
-                    generator.generate(
-                        node=node,
-                        file_info=info.file_info,
-                        generating_config=GeneratingConfig(
-                            #
-                        ),
-                    )
-
-                    progress()
+    generate(args, profiler, session)
 
 
 if __name__ == "__main__":
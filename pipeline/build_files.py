@@ -0,0 +1,28 @@
+import typing as tp
+
+from generators.file_utils import write_if_changed
+
+
+def _escape_make_path(path: str) -> str:
+    # Escaping understood by both make and ninja depfile parsers
+    return path.replace("\\", "\\\\").replace(" ", "\\ ").replace("#", "\\#").replace("$", "$$")
+
+
+def write_depfile(path: str, target: str, dependencies: tp.Iterable[str]):
+    """
+    Writes Make/Ninja depfile, that declares `target`
+    dependent on `dependencies`.
+    """
+    lines = [f"{_escape_make_path(target)}:"]
+    lines += [f" {_escape_make_path(dependency)}" for dependency in dependencies]
+
+    write_if_changed(path, " \\\n".join(lines) + "\n")
+
+
+def write_output_list(path: str, outputs: tp.Iterable[str]):
+    """
+    Writes paths of generated files, one per line. File is not
+    modified if list is the same, so build system, that depends
+    on it, is not reconfigured.
+    """
+    write_if_changed(path, "".join(f"{output}\n" for output in outputs))
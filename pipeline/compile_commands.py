@@ -0,0 +1,233 @@
+import os
+import re
+import json
+import shlex
+import logging
+import typing as tp
+
+logger = logging.getLogger(__name__)
+
+COMPILE_COMMANDS_FILE_NAME = "compile_commands.json"
+
+# Options, that are followed by separate value
+_OPTIONS_WITH_VALUE = {
+    "-o",
+    "-MF",
+    "-MT",
+    "-MQ",
+    "-I",
+    "-isystem",
+    "-iquote",
+    "-idirafter",
+    "-iprefix",
+    "-isysroot",
+    "--sysroot",
+    "-include",
+    "-imacros",
+    "-include-pch",
+    "-D",
+    "-U",
+    "-F",
+    "-x",
+    "-arch",
+    "-target",
+    "-gcc-toolchain",
+    "-Xclang",
+}
+
+# Options, that don't affect declarations, seen by parser:
+# output, optimization, debug info, dependency files, diagnostics
+_DROPPED_OPTIONS = {
+    "-c",
+    "-o",
+    "-S",
+    "-E",
+    "-pipe",
+    "-save-temps",
+    "--coverage",
+    "-include-pch",
+    "-M",
+    "-MM",
+    "-MD",
+    "-MMD",
+    "-MP",
+    "-MG",
+    "-MF",
+    "-MT",
+    "-MQ",
+    "-W",
+}
+# Joined forms of dropped options. Warnings and debug info are matched
+# exactly: `-Wp,-DNAME` defines macro, `-gcc-toolchain` selects headers.
+_DROPPED_PATTERN = re.compile(
+    r"-O.*"
+    r"|-g(?:[0-3]|gdb[0-3]?|dwarf.*|line-.*|split-dwarf.*|z.*|(?:no-)?column-info)?"
+    r"|-W(?:no-)?[A-Za-z0-9][\w+=.-]*|-W[al],.*"
+    r"|-M[FTQ].+"
+)
+_DROPPED_PREFIXES = (
+    "-fdiagnostics",
+    "-fcolor-diagnostics",
+    "-fno-color-diagnostics",
+    "-flto",
+    "-fprofile",
+    "-fcoverage",
+    "-fsanitize",
+    "-fdebug",
+    "-fpch",
+)
+
+# Options, value of which is path (relative to command directory)
+_PATH_OPTIONS = (
+    "-I",
+    "-isystem",
+    "-iquote",
+    "-idirafter",
+    "-isysroot",
+    "--sysroot",
+    "-include",
+    "-imacros",
+    "-F",
+    "-gcc-toolchain",
+    "--gcc-toolchain",
+)
+
+
+def _is_dropped(option: str) -> bool:
+    return (
+        option in _DROPPED_OPTIONS
+        or option.startswith(_DROPPED_PREFIXES)
+        or _DROPPED_PATTERN.fullmatch(option) is not None
+    )
+
+
+def _absolute_path_option(option: str, value: str, directory: str) -> tp.List[str]:
+    if option in _PATH_OPTIONS:
+        value = os.path.normpath(os.path.join(directory, value))
+    return [option, value]
+
+
+def filter_arguments(arguments: tp.List[str], directory: str, file_path: str) -> tp.List[str]:
+    """
+    Arguments of compiler command, that affect parsing of `file_path`.
+    Compiler, input file and options, that are not required
+    by parser, are dropped. Relative paths are made absolute.
+    """
+    result = []
+
+    index = 1
+    while index < len(arguments):
+        argument = arguments[index]
+        index += 1
+
+        if argument == "--":
+            continue
+
+        if argument in _OPTIONS_WITH_VALUE:
+            if index >= len(arguments):
+                break
+            value = arguments[index]
+            index += 1
+
+            if not _is_dropped(argument):
+                result += _absolute_path_option(argument, value, directory)
+            continue
+
+        if _is_dropped(argument):
+            continue
+
+        if not argument.startswith("-"):
+            # Input file
+            if os.path.normpath(os.path.join(directory, argument)) == file_path:
+                continue
+            result.append(argument)
+            continue
+
+        # Joined path options: `-Iinclude`, `--sysroot=/path`
+        for option in _PATH_OPTIONS:
+            if argument.startswith(option) and len(argument) > len(option):
+                value = argument[len(option) :]
+                separator = ""
+                if value.startswith("=") and option.startswith("--"):
+                    separator, value = "=", value[1:]
+                argument = f"{option}{separator}{os.path.normpath(os.path.join(directory, value))}"
+                break
+
+        result.append(argument)
+
+    return result
+
+
+class CompilationDatabase:
+    """
+    Compile commands, exported by build system
+    (`CMAKE_EXPORT_COMPILE_COMMANDS`).
+    """
+
+    def __init__(self, path: str, commands: tp.Dict[str, tp.List[str]]):
+        self.path = path
+        # Absolute path of file -> filtered arguments
+        self._commands = commands
+        # Directory -> arguments, used for headers of this directory
+        self._directory_commands: tp.Dict[str, tp.List[str]] = {}
+
+    @classmethod
+    def load(cls, path: str) -> "CompilationDatabase":
+        if os.path.isdir(path):
+            path = os.path.join(path, COMPILE_COMMANDS_FILE_NAME)
+        path = os.path.abspath(path)
+
+        try:
+            with open(path, "r") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            raise RuntimeError(f"Unable to read compilation database '{path}': {e}")
+
+        commands = {}
+        for entry in entries:
+            directory = entry["directory"]
+            file_path = os.path.normpath(os.path.join(directory, entry["file"]))
+
+            if "arguments" in entry:
+                arguments = entry["arguments"]
+            else:
+                arguments = shlex.split(entry["command"])
+
+            # The first command of file is used, like by clang tools
+            if file_path not in commands:
+                commands[file_path] = filter_arguments(arguments, directory, file_path)
+
+        logger.info("Loaded %d compile commands from '%s'", len(commands), path)
+        return cls(path, commands)
+
+    def __contains__(self, file_path: str) -> bool:
+        return os.path.abspath(file_path) in self._commands
+
+    def arguments(self, file_path: str, including_files: tp.Iterable[str] = ()) -> tp.List[str]:
+        """
+        Arguments of file command. Files, that don't have own command
+        (headers), are parsed with command of file, that includes them,
+        or of the closest (by path) file, that has command.
+        """
+        file_path = os.path.abspath(file_path)
+        if file_path in self._commands:
+            return self._commands[file_path]
+
+        for including_file in sorted(including_files):
+            if including_file in self._commands:
+                return self._commands[including_file]
+
+        directory = os.path.dirname(file_path)
+        if directory not in self._directory_commands:
+            self._directory_commands[directory] = self._closest_command(directory)
+        return self._directory_commands[directory]
+
+    def _closest_command(self, directory: str) -> tp.List[str]:
+        best_path = None
+        best_length = -1
+        for path in sorted(self._commands):
+            length = len(os.path.commonpath((directory, os.path.dirname(path))))
+            if length > best_length:
+                best_path, best_length = path, length
+
+        return [] if best_path is None else self._commands[best_path]
@@ -0,0 +1,39 @@
+import os
+import json
+import socket
+import tempfile
+import typing as tp
+
+# Environment variable with path of daemon socket
+SOCKET_ENV_VARIABLE = "CPP_CODEGEN_SOCKET"
+
+
+def default_socket_path() -> str:
+    path = os.environ.get(SOCKET_ENV_VARIABLE)
+    if path:
+        return path
+
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"cpp_codegen-{os.getuid()}.sock")
+
+
+# Messages are single line JSON objects.
+#
+# Request: {"argv": [...], "cwd": "..."}
+# Response: {"exit_code": int, "stdout": "...", "stderr": "..."}
+#   or {"error": "..."} if daemon can't execute request.
+
+
+def send_message(sock: socket.socket, message: tp.Dict[str, tp.Any]):
+    sock.sendall(json.dumps(message).encode() + b"\n")
+
+
+def receive_message(sock: socket.socket) -> tp.Optional[tp.Dict[str, tp.Any]]:
+    data = b""
+    while not data.endswith(b"\n"):
+        chunk = sock.recv(65536)
+        if not chunk:
+            return None
+        data += chunk
+
+    return json.loads(data)
@@ -0,0 +1,220 @@
+import os
+import re
+import json
+import fnmatch
+import logging
+import typing as tp
+
+from generators.file_utils import write_if_changed
+
+logger = logging.getLogger(__name__)
+
+FILE_INDEX_NAME = ".cpp_codegen_file_index.json"
+FILE_INDEX_VERSION = 1
+
+# Directories of version control systems never contain project sources
+_SKIPPED_DIRECTORIES = {".git", ".hg", ".svn"}
+
+
+class PathMatcher:
+    """
+    All ignore globs, compiled into single regular expression.
+    """
+
+    def __init__(self, globs: tp.Optional[tp.Iterable[str]]):
+        globs = list(globs or [])
+
+        self._file_regex = self._compile(globs)
+        # Glob, that ends with `*`, matches every path inside directory, if it
+        # matches directory path with trailing separator (`*` matches `/` too),
+        # so such directories are not walked at all.
+        self._directory_regex = self._compile([glob for glob in globs if glob.endswith("*")])
+
+    @staticmethod
+    def _compile(globs: tp.List[str]) -> tp.Optional[tp.Pattern]:
+        if not globs:
+            return None
+        return re.compile("|".join(f"(?:{fnmatch.translate(glob)})" for glob in globs))
+
+    def matches_file(self, path: str) -> bool:
+        return self._file_regex is not None and self._file_regex.match(path) is not None
+
+    def matches_directory(self, path: str) -> bool:
+        return (
+            self._directory_regex is not None
+            and self._directory_regex.match(os.path.join(path, "")) is not None
+        )
+
+
+class FileIndex:
+    """
+    Project files with one of `extensions`, that are not ignored.
+    Directories, that are ignored entirely, and `pruned_directories`
+    are not walked. Listings of directories may be reused from
+    previous run (see `load`): directory modification time changes
+    when its entries are added, removed or renamed.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        extensions: tp.Set[str],
+        ignore_globs: tp.Optional[tp.List[str]],
+        pruned_directories: tp.Iterable[str] = (),
+    ):
+        self._root = root
+        self._extensions = extensions
+        self._matcher = PathMatcher(ignore_globs)
+        self._pruned_directories = {os.path.abspath(path) for path in pruned_directories}
+        self._key = json.dumps(
+            [os.getcwd(), root, sorted(extensions), ignore_globs, sorted(self._pruned_directories)]
+        )
+
+        # Directory -> [modification time, files, subdirectories]
+        self._previous_listings: tp.Dict[str, tp.List[tp.Any]] = {}
+        self._listings: tp.Dict[str, tp.List[tp.Any]] = {}
+
+        self.files: tp.List[str] = []
+
+    def load(self, path: str):
+        """
+        Loads directory listings, saved by `save`.
+        """
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning("Unable to read file index '%s': %s", path, e)
+            return
+
+        if data.get("version") == FILE_INDEX_VERSION and data.get("key") == self._key:
+            self._previous_listings = data["directories"]
+
+    def save(self, path: str):
+        write_if_changed(
+            path,
+            json.dumps(
+                {
+                    "version": FILE_INDEX_VERSION,
+                    "key": self._key,
+                    "directories": self._listings,
+                },
+                sort_keys=True,
+            ),
+        )
+
+    @property
+    def directories(self) -> tp.Dict[str, int]:
+        """
+        Walked directories (absolute paths) -> modification time
+        at the moment of walk.
+        """
+        return {
+            os.path.abspath(directory): listing[0]
+            for directory, listing in self._listings.items()
+        }
+
+    def scan(self) -> tp.List[str]:
+        self._listings = {}
+
+        files = []
+        directories = [self._root]
+        while directories:
+            directory = directories.pop()
+            directory_files, subdirectories = self._list(directory)
+
+            files += [os.path.join(directory, name) for name in directory_files]
+            directories += [os.path.join(directory, name) for name in subdirectories]
+
+        self.files = sorted(files)
+        return self.files
+
+    def _list(self, directory: str) -> tp.Tuple[tp.List[str], tp.List[str]]:
+        # Time is taken before listing, so changes made during
+        # listing are noticed by next run
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            return [], []
+
+        previous_listing = self._previous_listings.get(directory)
+        if previous_listing is not None and previous_listing[0] == mtime:
+            listing = previous_listing
+        else:
+            listing = [mtime, *self._read_directory(directory)]
+
+        self._listings[directory] = listing
+        return listing[1], listing[2]
+
+    def _read_directory(self, directory: str) -> tp.Tuple[tp.List[str], tp.List[str]]:
+        files = []
+        subdirectories = []
+
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return files, subdirectories
+
+        for entry in entries:
+            path = os.path.join(directory, entry.name)
+
+            if entry.is_dir():
+                # Symbolic links to directories are not followed, like by `os.walk`
+                if entry.is_symlink() or entry.name in _SKIPPED_DIRECTORIES:
+                    continue
+                if os.path.abspath(path) in self._pruned_directories:
+                    continue
+                if self._matcher.matches_directory(path):
+                    continue
+                subdirectories.append(entry.name)
+            elif os.path.splitext(entry.name)[1] in self._extensions:
+                if not self._matcher.matches_file(path):
+                    files.append(entry.name)
+
+        return sorted(files), sorted(subdirectories)
+
+
+class IncludeIndex:
+    """
+    Converts paths of project files into include paths. File is included
+    relative to the longest include directory, that contains it.
+    """
+
+    def __init__(self, include_dirs: tp.Iterable[str]):
+        self._include_dirs = [os.path.abspath(include_dir) for include_dir in include_dirs]
+        self._include_dirs_set = set(self._include_dirs)
+        # Directory -> include directory, that contains it
+        self._containing_dirs: tp.Dict[str, tp.Optional[str]] = {}
+        self._include_paths: tp.Dict[str, tp.Optional[str]] = {}
+
+    def include_path(self, file_path: str) -> tp.Optional[str]:
+        file_path = os.path.abspath(file_path)
+        if file_path not in self._include_paths:
+            self._include_paths[file_path] = self._resolve(file_path)
+        return self._include_paths[file_path]
+
+    def _containing_include_dir(self, directory: str) -> tp.Optional[str]:
+        if directory not in self._containing_dirs:
+            if directory in self._include_dirs_set:
+                result = directory
+            else:
+                parent = os.path.dirname(directory)
+                result = None if parent == directory else self._containing_include_dir(parent)
+            self._containing_dirs[directory] = result
+        return self._containing_dirs[directory]
+
+    def _resolve(self, file_path: str) -> tp.Optional[str]:
+        include_dir = self._containing_include_dir(os.path.dirname(file_path))
+        if include_dir is not None:
+            return os.path.relpath(file_path, include_dir)
+
+        # File is not located in any include directory. Path relative
+        # to the last include directory, that shares common parent
+        # with it, is used.
+        for include_dir in reversed(self._include_dirs):
+            if os.path.commonpath((file_path, include_dir)) != "/":
+                return os.path.relpath(file_path, include_dir)
+
+        return None
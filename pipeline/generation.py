@@ -0,0 +1,666 @@
+import os
+import logging
+import dataclasses
+import typing as tp
+import concurrent.futures
+
+import alive_progress
+import clang.cindex
+
+from generators.basic_generator import BasicGenerator, FileInfo, GeneratingConfig
+from generators.jinja_utils import use_precompiled_templates
+from generators.registry import create_generators, index_by_kind
+from pipeline import stamp
+from pipeline.build_files import write_depfile, write_output_list
+from pipeline.compile_commands import CompilationDatabase
+from pipeline.file_index import FILE_INDEX_NAME, FileIndex, IncludeIndex
+from pipeline.manifest import (
+    MANIFEST_FILE_NAME,
+    Manifest,
+    libclang_version,
+    tool_fingerprint,
+    tool_source_files,
+)
+from pipeline.parse_cache import TranslationUnitCache
+from pipeline.parse_options import ParseOptions
+from pipeline.prefilter import CODEGEN_MARKER, contains_marker
+from pipeline.shards import FRAGMENT_EXTENSION, write_shards
+from pipeline.profiling import Profiler, Stopwatch, TraceEvent, set_active_profiler
+from pipeline.traversal import walk_annotated_declarations
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+SOURCE_EXTENSIONS = {".cpp"}
+HEADER_EXTENSIONS = {".hpp"}
+
+
+@dataclasses.dataclass()
+class ExtractedDeclaration:
+    __slots__ = ("usr", "path", "declaration")
+
+    # Clang USR, unique for declaration across translation units
+    usr: str
+    # File, where declaration is located
+    path: str
+    # Declaration, extracted by generator
+    declaration: tp.Any
+
+
+@dataclasses.dataclass()
+class ParseResult:
+    __slots__ = ("path", "declarations", "dependencies", "covered_files", "events")
+
+    path: str
+    # Generator index -> extracted declarations
+    declarations: tp.Dict[int, tp.List[ExtractedDeclaration]]
+    # Files, included by translation unit
+    dependencies: tp.List[str]
+    # Project files, whose declarations were visited in translation unit
+    # (not including parsed file itself). They don't have to be parsed.
+    covered_files: tp.List[str]
+    # Parse and traversal events, measured in process, that parsed file
+    events: tp.List[TraceEvent]
+
+
+def setup_clang_library(clang_library: tp.Optional[str]):
+    # Library can not be changed after it was loaded (for example
+    # in forked worker processes).
+    if clang_library is not None and not clang.cindex.Config.loaded:
+        clang.cindex.Config.set_library_file(clang_library)
+
+
+class Session:
+    """
+    State, that can be reused by several generation runs
+    in the same process (see `daemon.py`): libclang index,
+    generators with compiled templates and parsed translation units.
+    Project files of the last successful run are kept too,
+    so they are not discovered again, if changes are known.
+    """
+
+    def __init__(self, translation_units_capacity: int = 0):
+        self._translation_units_capacity = translation_units_capacity
+        self._translation_units: tp.Optional[TranslationUnitCache] = None
+        self._generators: tp.Dict[tp.Tuple, tp.List[BasicGenerator]] = {}
+        # Discovered project files and walked directories
+        self.project_files: tp.Optional[tp.List[str]] = None
+        self.project_directories: tp.Set[str] = set()
+
+    @property
+    def translation_units(self) -> TranslationUnitCache:
+        # Index can be created only after libclang is configured
+        if self._translation_units is None:
+            self._translation_units = TranslationUnitCache(
+                clang.cindex.Index.create(),
+                capacity=self._translation_units_capacity,
+            )
+        return self._translation_units
+
+    def generators(self, generator_config: tp.Dict[str, tp.Any]) -> tp.List[BasicGenerator]:
+        key = tuple(sorted(generator_config.items()))
+        if key not in self._generators:
+            self._generators[key] = create_generators(generator_config)
+        return self._generators[key]
+
+
+def extract_declarations(
+    cursor: clang.cindex.Cursor,
+    generators: tp.List[BasicGenerator],
+    visit_included_file: tp.Callable[[str], bool],
+) -> tp.Dict[int, tp.List[ExtractedDeclaration]]:
+    declarations: tp.Dict[int, tp.List[ExtractedDeclaration]] = {}
+    generators_by_kind = index_by_kind(generators)
+
+    for node, node_comment, node_file_path in walk_annotated_declarations(
+        cursor,
+        visit_included_file,
+        kinds=generators_by_kind,
+    ):
+        for generator_index, generator in generators_by_kind[node.kind]:
+            if generator.need_to_generate(node, node_comment):
+                declarations.setdefault(generator_index, list()).append(
+                    ExtractedDeclaration(
+                        usr=node.get_usr(),
+                        path=node_file_path,
+                        declaration=generator.extract(node, node_comment),
+                    )
+                )
+
+    return declarations
+
+
+def parse_file(
+    translation_units: TranslationUnitCache,
+    generators: tp.List[BasicGenerator],
+    parse_options: ParseOptions,
+    file_path: str,
+    project_files: tp.Set[str],
+    covered_files: tp.Set[str],
+) -> ParseResult:
+    """
+    Parses file and extracts declarations from it. Declarations
+    of included project files are extracted too, unless these
+    files are already covered by other translation units.
+    """
+    # Parsing may be performed in worker process, so events are
+    # measured by local profiler and returned with result
+    profiler = Profiler()
+    stopwatch = Stopwatch()
+
+    tu = translation_units.parse(file_path, parse_options)
+    profiler.lap("parse", stopwatch, file=file_path)
+
+    def visit_included_file(path: str) -> bool:
+        return path in project_files and path not in covered_files
+
+    declarations = extract_declarations(tu.cursor, generators, visit_included_file)
+    dependencies = sorted(
+        {os.path.abspath(inclusion.include.name) for inclusion in tu.get_includes()}
+    )
+    profiler.lap("traversal", stopwatch, file=file_path)
+
+    # Declarations don't reference any cursor, so translation unit
+    # is disposed right here (unless it's cached) instead of living
+    # until generation.
+    del tu
+
+    return ParseResult(
+        path=file_path,
+        declarations=declarations,
+        dependencies=dependencies,
+        covered_files=[path for path in dependencies if visit_included_file(path)],
+        events=profiler.events,
+    )
+
+
+# State of parsing worker process. Initialized by `_init_parse_worker`.
+_WORKER_STATE: tp.Dict[str, tp.Any] = {}
+
+
+def _init_parse_worker(
+    clang_library: tp.Optional[str],
+    generator_config: tp.Dict[str, tp.Any],
+    project_files: tp.Set[str],
+):
+    setup_clang_library(clang_library)
+
+    _WORKER_STATE["project_files"] = project_files
+    # Every worker tracks files covered by its own translation units.
+    # Duplicates between workers are removed by USR.
+    _WORKER_STATE["covered_files"] = set()
+    _WORKER_STATE["translation_units"] = TranslationUnitCache(clang.cindex.Index.create())
+    _WORKER_STATE["generators"] = create_generators(generator_config)
+
+
+def _parse_file_in_worker(file_path: str, parse_options: ParseOptions) -> ParseResult:
+    result = parse_file(
+        _WORKER_STATE["translation_units"],
+        _WORKER_STATE["generators"],
+        parse_options,
+        file_path,
+        _WORKER_STATE["project_files"],
+        _WORKER_STATE["covered_files"],
+    )
+
+    _WORKER_STATE["covered_files"].add(os.path.abspath(file_path))
+    _WORKER_STATE["covered_files"].update(result.covered_files)
+
+    return result
+
+
+def parse_files(
+    args,
+    jobs: int,
+    session: Session,
+    generator_config: tp.Dict[str, tp.Any],
+    parse_options_of: tp.Callable[[str], ParseOptions],
+    files: tp.List[str],
+    project_files: tp.Set[str],
+) -> tp.Iterator[ParseResult]:
+    """
+    Yields parse results of source files and then of header files,
+    that were not covered by already parsed translation units.
+    Results are yielded in the same order as `files`, so parallel
+    parsing gives exactly the same output as serial one.
+    """
+    sources = [
+        file_path
+        for file_path in files
+        if os.path.splitext(file_path)[1] not in HEADER_EXTENSIONS
+    ]
+    headers = [
+        file_path
+        for file_path in files
+        if os.path.splitext(file_path)[1] in HEADER_EXTENSIONS
+    ]
+
+    covered_files: tp.Set[str] = set()
+
+    def not_covered(file_paths: tp.List[str]) -> tp.List[str]:
+        return [
+            file_path
+            for file_path in file_paths
+            if os.path.abspath(file_path) not in covered_files
+        ]
+
+    def cover(result: ParseResult):
+        covered_files.add(os.path.abspath(result.path))
+        covered_files.update(result.covered_files)
+
+    if jobs <= 1 or len(files) <= 1:
+        for file_path in sources + headers:
+            if os.path.abspath(file_path) in covered_files:
+                continue
+
+            result = parse_file(
+                session.translation_units,
+                session.generators(generator_config),
+                parse_options_of(file_path),
+                file_path,
+                project_files,
+                covered_files,
+            )
+            cover(result)
+            yield result
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=min(jobs, len(files)),
+        initializer=_init_parse_worker,
+        initargs=(args.clang_library, generator_config, project_files),
+    ) as executor:
+        for result in executor.map(
+            _parse_file_in_worker, sources, [parse_options_of(path) for path in sources]
+        ):
+            cover(result)
+            yield result
+
+        # Headers are submitted only after all sources are parsed,
+        # so headers covered by sources are not parsed at all.
+        headers = not_covered(headers)
+        yield from executor.map(
+            _parse_file_in_worker, headers, [parse_options_of(path) for path in headers]
+        )
+
+
+def parse_options_resolver(
+    args,
+    compilation_database: tp.Optional[CompilationDatabase],
+    manifest: Manifest,
+) -> tp.Callable[[str], ParseOptions]:
+    """
+    Returns function, that gives parse options of file. Without
+    compilation database all files are parsed with the same options.
+    """
+    default_parse_options = ParseOptions.from_args(args)
+    if compilation_database is None:
+        return lambda file_path: default_parse_options
+
+    # Headers are parsed with command of file, that included them in previous run
+    including_files = manifest.including_files()
+    parse_options: tp.Dict[str, ParseOptions] = {}
+
+    def parse_options_of(file_path: str) -> ParseOptions:
+        file_path = os.path.abspath(file_path)
+        if file_path not in parse_options:
+            parse_options[file_path] = ParseOptions.from_args(
+                args,
+                compilation_database.arguments(file_path, including_files.get(file_path, ())),
+            )
+        return parse_options[file_path]
+
+    return parse_options_of
+
+
+def update_project_files(
+    session: Session, changed_files: tp.Iterable[str]
+) -> tp.Optional[tp.List[str]]:
+    """
+    Applies created and removed files to project files of previous run
+    of session. Returns None, if project has to be discovered again:
+    there is no previous run, or directories were changed.
+    """
+    if session.project_files is None:
+        return None
+
+    project_files = set(session.project_files)
+    for path in changed_files:
+        if (
+            os.path.splitext(path)[1] not in SOURCE_EXTENSIONS | HEADER_EXTENSIONS
+            or os.path.isdir(path)
+            or os.path.abspath(os.path.dirname(path)) not in session.project_directories
+        ):
+            return None
+
+        if os.path.isfile(path):
+            project_files.add(path)
+        else:
+            project_files.discard(path)
+
+    return sorted(project_files)
+
+
+def generate(
+    args,
+    profiler: tp.Optional[Profiler] = None,
+    session: tp.Optional[Session] = None,
+    changed_files: tp.Optional[tp.Set[str]] = None,
+):
+    """
+    Generates files of project. `changed_files` are files, created, changed
+    or removed since previous run of `session`, if they are known.
+    """
+    if profiler is None:
+        profiler = Profiler()
+
+    if session is None:
+        session = Session()
+
+    # Generators and file writes report their events to active profiler.
+    # Event of every render and write is recorded, so it's done only
+    # if trace is requested.
+    if args.profile is not None:
+        set_active_profiler(profiler)
+    try:
+        run(args, profiler, session, changed_files)
+    finally:
+        set_active_profiler(None)
+
+    if args.profile is not None:
+        profiler.write_trace(args.profile)
+        logger.info("Trace is written to '%s'", args.profile)
+
+        for line in profiler.summary():
+            logger.info(line)
+
+
+def run(
+    args,
+    profiler: Profiler,
+    session: Session,
+    changed_files: tp.Optional[tp.Set[str]] = None,
+):
+    logger.info("Creating generators")
+
+    setup_clang_library(args.clang_library)
+
+    generator_config = {
+        "include_path": args.output_include_dir,
+        "source_path": args.output_source_dir,
+    }
+
+    with profiler.phase("setup"):
+        if args.precompiled_templates is not None:
+            use_precompiled_templates(args.precompiled_templates)
+
+        generators = session.generators(generator_config)
+    logger.info("Created %d generators", len(generators))
+
+    compilation_database = None
+    if args.compile_commands is not None:
+        compilation_database = CompilationDatabase.load(args.compile_commands)
+
+    generating_config = GeneratingConfig(
+        conversion_backend=args.conversion_backend,
+        reverse_conversion_backend=args.reverse_conversion_backend,
+        output_shards=args.output_shards,
+    )
+
+    file_index_path = os.path.join(args.output_source_dir, FILE_INDEX_NAME)
+
+    # Project is not discovered again, if all changes since
+    # previous run are known (see `pipeline/watch.py`)
+    discovered_files = None
+    if changed_files is not None:
+        discovered_files = update_project_files(session, changed_files)
+        if discovered_files is None:
+            changed_files = None
+        else:
+            changed_files = {os.path.abspath(path) for path in changed_files}
+
+    # Files of failed run are not reused
+    session.project_files = None
+
+    with profiler.phase("discovery"):
+        if discovered_files is None:
+            # Generated files are written into output directories
+            file_index = FileIndex(
+                args.project_dir,
+                SOURCE_EXTENSIONS | HEADER_EXTENSIONS,
+                args.ignore_path_glob,
+                pruned_directories=(args.output_include_dir, args.output_source_dir),
+            )
+            if args.persist_file_index:
+                file_index.load(file_index_path)
+
+            discovered_files = file_index.scan()
+
+            # Modification times of project directories and files for
+            # no-op run check. They are taken before files are parsed.
+            project_directories = file_index.directories
+
+            if args.persist_file_index:
+                file_index.save(file_index_path)
+        else:
+            project_directories = stamp.snapshot(session.project_directories)
+
+        files_to_proceed = discovered_files
+
+        # Sources, that are not compiled by build, are not parsed
+        if compilation_database is not None:
+            files_to_proceed = [
+                file_path
+                for file_path in files_to_proceed
+                if os.path.splitext(file_path)[1] in HEADER_EXTENSIONS
+                or file_path in compilation_database
+            ]
+
+    logger.info("Found %d files to proceed", len(files_to_proceed))
+
+    project_files = {os.path.abspath(file_path) for file_path in files_to_proceed}
+    project_file_states = stamp.snapshot(project_files)
+
+    with profiler.phase("manifest"):
+        manifest = Manifest.load(
+            os.path.join(args.output_source_dir, MANIFEST_FILE_NAME),
+            fingerprint={
+                "tool": tool_fingerprint(),
+                "libclang": libclang_version(),
+                "prefilter": str(not args.disable_prefilter),
+                "generating_config": repr(dataclasses.asdict(generating_config)),
+                # Includes and paths of generated files depend on them
+                "project_include_dirs": repr(
+                    [os.path.abspath(path) for path in args.project_include_dir]
+                ),
+                "output_include_dir": os.path.abspath(args.output_include_dir),
+                "output_source_dir": os.path.abspath(args.output_source_dir),
+                "namespace": args.namespace,
+            },
+        )
+
+        parse_options_of = parse_options_resolver(args, compilation_database, manifest)
+
+        if not args.force_regenerate:
+            up_to_date_files = {
+                file_path
+                for file_path in files_to_proceed
+                if manifest.is_up_to_date(file_path, parse_options_of(file_path), changed_files)
+            }
+
+            for file_path in up_to_date_files:
+                manifest.keep(file_path)
+
+            files_to_proceed = [
+                file_path
+                for file_path in files_to_proceed
+                if file_path not in up_to_date_files
+            ]
+
+            logger.info(
+                "Skipping %d unchanged files, %d files left to proceed",
+                len(up_to_date_files),
+                len(files_to_proceed),
+            )
+
+    with profiler.phase("prefilter"):
+        if not args.disable_prefilter:
+            # Files without marker can't contain annotated declarations,
+            # there is no need to parse them.
+            unmarked_files = {
+                file_path
+                for file_path in files_to_proceed
+                if not contains_marker(file_path)
+            }
+
+            for file_path in unmarked_files:
+                manifest.update(
+                    file_path, parse_options_of(file_path), dependencies=[], outputs=[]
+                )
+
+            files_to_proceed = [
+                file_path
+                for file_path in files_to_proceed
+                if file_path not in unmarked_files
+            ]
+
+            logger.info(
+                "Skipping %d files without '%s' marker, %d files left to parse",
+                len(unmarked_files),
+                CODEGEN_MARKER,
+                len(files_to_proceed),
+            )
+
+    # Files, that have to be parsed or covered by other translation units
+    pending_files = {os.path.abspath(file_path) for file_path in files_to_proceed}
+
+    include_index = IncludeIndex(args.project_include_dir)
+
+    # USRs of declarations, generated during this run
+    generated_usrs: tp.Set[str] = set()
+
+    # Every file is generated right after it was parsed, so
+    # only one translation unit (per worker) is kept in memory.
+    with alive_progress.alive_bar(
+        len(files_to_proceed),
+        title="Generating",
+    ) as progress:
+        for result in parse_files(
+            args,
+            # Changed files are reparsed with translation units of session
+            1 if changed_files is not None else args.jobs,
+            session,
+            generator_config,
+            parse_options_of,
+            files_to_proceed,
+            project_files,
+        ):
+            progress.text = os.path.basename(result.path)
+
+            for event in result.events:
+                profiler.add(event)
+
+            outputs = []
+            for generator_index, declarations in result.declarations.items():
+                for declaration in declarations:
+                    # The same declaration may be visited in several
+                    # translation units. It's generated only once.
+                    if declaration.usr:
+                        if declaration.usr in generated_usrs:
+                            continue
+                        generated_usrs.add(declaration.usr)
+
+                    outputs += generators[generator_index].generate(
+                        declaration=declaration.declaration,
+                        file_info=FileInfo(
+                            project_include_dirs=args.project_include_dir,
+                            path=declaration.path,
+                            include_path=include_index.include_path(declaration.path),
+                        ),
+                        generating_config=generating_config,
+                    )
+
+            manifest.update(
+                result.path,
+                parse_options_of(result.path),
+                dependencies=result.dependencies,
+                outputs=outputs,
+            )
+
+            if os.path.abspath(result.path) in pending_files:
+                pending_files.remove(os.path.abspath(result.path))
+                progress()
+
+            # Covered files are not parsed. Their declarations were generated
+            # within this translation unit, so they have to be processed again
+            # if it changes.
+            for covered_file in result.covered_files:
+                if covered_file not in pending_files:
+                    continue
+
+                # Covered file is parsed with command of translation unit
+                manifest.update(
+                    covered_file,
+                    parse_options_of(result.path),
+                    dependencies=[result.path],
+                    outputs=[],
+                )
+                pending_files.remove(covered_file)
+                progress()
+
+    with profiler.phase("manifest"):
+        # Outputs of previous run may be in other output directories
+        output_dirs = {args.output_include_dir, args.output_source_dir}
+        for name in ("output_include_dir", "output_source_dir"):
+            if name in manifest.previous_fingerprint:
+                output_dirs.add(manifest.previous_fingerprint[name])
+
+        for output in manifest.remove_stale_outputs(output_dirs):
+            logger.info("Removed stale output '%s'", output)
+
+        manifest.save()
+
+    # Fragments of files, that were not changed, are included too
+    with profiler.phase("shards"):
+        shards = write_shards(
+            args.output_source_dir,
+            [output for output in manifest.outputs() if output.endswith(FRAGMENT_EXTENSION)],
+            args.output_shards,
+        )
+
+    if args.output_list is not None:
+        write_output_list(args.output_list, sorted(manifest.outputs() + shards))
+
+    # Generator sources, libclang and compile commands may be updated too
+    tool_files = tool_source_files() + [clang.cindex.__file__, clang.cindex.conf.lib._name]
+    if compilation_database is not None:
+        tool_files.append(compilation_database.path)
+
+    # Changed generator or its templates rerun build-time generation too.
+    # Library may be found by name, missing dependency would rerun every build.
+    if args.depfile is not None:
+        write_depfile(
+            args.depfile,
+            args.stamp,
+            manifest.inputs() + [path for path in tool_files if os.path.isfile(path)],
+        )
+
+    if args.stamp is not None:
+        stamp.touch(args.stamp)
+
+    outputs = manifest.outputs() + shards
+    for build_file in (args.output_list, args.depfile):
+        if build_file is not None:
+            outputs.append(os.path.abspath(build_file))
+
+    stamp.save(
+        os.path.join(args.output_source_dir, stamp.STAMP_FILE_NAME),
+        stamp.make_key(args),
+        directories=project_directories,
+        files={**stamp.snapshot(manifest.inputs() + tool_files), **project_file_states},
+        outputs=outputs,
+    )
+
+    session.project_files = discovered_files
+    session.project_directories = set(project_directories)
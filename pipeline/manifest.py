@@ -0,0 +1,344 @@
+import os
+import json
+import hashlib
+import logging
+import dataclasses
+import typing as tp
+
+import clang.cindex
+
+from generators.file_utils import write_if_changed
+from generators.registry import plugin_source_files
+from pipeline.parse_options import ParseOptions
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+MANIFEST_FILE_NAME = ".cpp_codegen_manifest.json"
+
+_TOOL_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Directories (relative to tool root) that affect generated output
+_TOOL_SOURCE_DIRS = ("generators", "pipeline")
+_TOOL_SOURCE_EXTENSIONS = {".py", ".jinja2"}
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def libclang_version() -> str:
+    # `clang_getClangVersion` is not registered by python bindings
+    function = clang.cindex.conf.lib.clang_getClangVersion
+    function.argtypes = []
+    function.restype = clang.cindex._CXString
+    return clang.cindex._CXString.from_result(function())
+
+
+def tool_source_files() -> tp.List[str]:
+    """
+    Generator sources and templates, including
+    sources of third-party generators.
+    """
+    paths = [os.path.join(_TOOL_ROOT, "main.py")]
+    for source_dir in _TOOL_SOURCE_DIRS:
+        for dirpath, dirnames, filenames in os.walk(os.path.join(_TOOL_ROOT, source_dir)):
+            dirnames[:] = [name for name in dirnames if name != "__pycache__"]
+            paths += [
+                os.path.join(dirpath, filename)
+                for filename in filenames
+                if os.path.splitext(filename)[1] in _TOOL_SOURCE_EXTENSIONS
+            ]
+
+    return sorted(paths + plugin_source_files())
+
+
+def tool_fingerprint() -> str:
+    """
+    Hash of generator sources and templates. Changing any of
+    them invalidates whole manifest.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(str(MANIFEST_VERSION).encode())
+    for path in tool_source_files():
+        hasher.update(os.path.relpath(path, _TOOL_ROOT).encode())
+        with open(path, "rb") as f:
+            hasher.update(f.read())
+
+    return hasher.hexdigest()
+
+
+class FileHasher:
+    """
+    Calculates content hashes of files. Hash of file with the same
+    size and modification time as in previous run is reused,
+    so only changed files are read.
+    """
+
+    def __init__(self, known_states: tp.Dict[str, tp.List[tp.Any]]):
+        # path -> [mtime_ns, size, hash]
+        self._known_states = known_states
+        self._states: tp.Dict[str, tp.List[tp.Any]] = {}
+
+    @property
+    def states(self) -> tp.Dict[str, tp.List[tp.Any]]:
+        return self._states
+
+    def hash(self, path: str) -> tp.Optional[str]:
+        state = self._states.get(path)
+        if state is not None:
+            return state[2]
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        known_state = self._known_states.get(path)
+        if known_state is not None and known_state[:2] == [stat.st_mtime_ns, stat.st_size]:
+            self._states[path] = known_state
+            return known_state[2]
+
+        with open(path, "rb") as f:
+            result = hash_bytes(f.read())
+
+        self._states[path] = [stat.st_mtime_ns, stat.st_size, result]
+        return result
+
+    def keep(self, path: str):
+        """
+        Keeps known state of file, that is not hashed in this run.
+        """
+        if path not in self._states and path in self._known_states:
+            self._states[path] = self._known_states[path]
+
+
+@dataclasses.dataclass()
+class ManifestEntry:
+    hash: str
+    parse_args: tp.List[str]
+    parse_flags: int
+    # Path of included file -> content hash
+    dependencies: tp.Dict[str, str]
+    outputs: tp.List[str]
+
+
+class Manifest:
+    """
+    Persistent per input file record of previous generation.
+    Used to skip parsing and generation of files, that
+    (and whose dependencies) were not changed since last run.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fingerprint: tp.Dict[str, str],
+        entries: tp.Dict[str, ManifestEntry],
+        file_states: tp.Dict[str, tp.List[tp.Any]],
+        previous_outputs: tp.Iterable[str] = (),
+        previous_fingerprint: tp.Optional[tp.Dict[str, str]] = None,
+    ):
+        self._path = path
+        self._fingerprint = fingerprint
+        # Fingerprint of previous run, even if it differs
+        self.previous_fingerprint = previous_fingerprint or {}
+        self._previous_entries = entries
+        # Outputs of previous run, even if its entries can't be reused
+        self._previous_outputs = sorted(set(previous_outputs))
+        self._entries: tp.Dict[str, ManifestEntry] = {}
+        self._hasher = FileHasher(file_states)
+
+    @classmethod
+    def load(cls, path: str, fingerprint: tp.Dict[str, str]) -> "Manifest":
+        entries = {}
+        file_states = {}
+        previous_outputs = []
+
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = None
+        except (OSError, ValueError) as e:
+            logger.warning("Unable to read manifest '%s': %s", path, e)
+            data = None
+
+        if data is not None:
+            previous_outputs = [
+                output
+                for entry in data.get("files", {}).values()
+                for output in entry.get("outputs", [])
+            ]
+
+        if data is not None and data.get("fingerprint") == fingerprint:
+            entries = {
+                file_path: ManifestEntry(**entry)
+                for file_path, entry in data["files"].items()
+            }
+            file_states = data["file_states"]
+        elif data is not None:
+            logger.info("Manifest fingerprint changed, regenerating everything")
+
+        return cls(
+            path,
+            fingerprint,
+            entries,
+            file_states,
+            previous_outputs,
+            data.get("fingerprint") if data is not None else None,
+        )
+
+    def is_up_to_date(
+        self,
+        file_path: str,
+        parse_options: ParseOptions,
+        changed_files: tp.Optional[tp.Set[str]] = None,
+    ) -> bool:
+        """
+        Checks, that file, its dependencies and parse options were not changed
+        since previous run. If all `changed_files` since previous run are known
+        (see `pipeline/watch.py`), files are not hashed: file is outdated if it
+        or any file, it includes, is changed.
+        """
+        file_path = os.path.abspath(file_path)
+
+        entry = self._previous_entries.get(file_path)
+        if entry is None:
+            return False
+
+        if entry.parse_args != parse_options.args:
+            return False
+
+        if entry.parse_flags != parse_options.flags:
+            return False
+
+        if changed_files is not None:
+            if file_path in changed_files or not changed_files.isdisjoint(entry.dependencies):
+                return False
+        else:
+            if self._hasher.hash(file_path) != entry.hash:
+                return False
+
+            for dependency, dependency_hash in entry.dependencies.items():
+                if self._hasher.hash(dependency) != dependency_hash:
+                    return False
+
+        return all(os.path.exists(output) for output in entry.outputs)
+
+    def keep(self, file_path: str):
+        """
+        Moves record of skipped file into new manifest.
+        """
+        file_path = os.path.abspath(file_path)
+        entry = self._previous_entries[file_path]
+        self._entries[file_path] = entry
+
+        # Skipped file may be not hashed, its known states are saved as is
+        self._hasher.keep(file_path)
+        for dependency in entry.dependencies:
+            self._hasher.keep(dependency)
+
+    def update(
+        self,
+        file_path: str,
+        parse_options: ParseOptions,
+        dependencies: tp.Iterable[str],
+        outputs: tp.Iterable[str],
+    ):
+        file_path = os.path.abspath(file_path)
+
+        dependency_hashes = {}
+        for dependency in dependencies:
+            dependency = os.path.abspath(dependency)
+            dependency_hash = self._hasher.hash(dependency)
+            if dependency_hash is not None:
+                dependency_hashes[dependency] = dependency_hash
+
+        self._entries[file_path] = ManifestEntry(
+            hash=self._hasher.hash(file_path),
+            parse_args=list(parse_options.args),
+            parse_flags=parse_options.flags,
+            dependencies=dependency_hashes,
+            outputs=sorted({os.path.abspath(output) for output in outputs}),
+        )
+
+    def inputs(self) -> tp.List[str]:
+        """
+        Files, recorded in this run, and files, included by them.
+        """
+        result = set(self._entries.keys())
+        for entry in self._entries.values():
+            result.update(entry.dependencies.keys())
+        return sorted(result)
+
+    def including_files(self) -> tp.Dict[str, tp.List[str]]:
+        """
+        File -> files of previous run, that included it.
+        """
+        result: tp.Dict[str, tp.List[str]] = {}
+        for file_path, entry in self._previous_entries.items():
+            for dependency in entry.dependencies:
+                result.setdefault(dependency, []).append(file_path)
+        return result
+
+    def outputs(self) -> tp.List[str]:
+        """
+        Files, generated (or kept) in this run.
+        """
+        return sorted({output for entry in self._entries.values() for output in entry.outputs})
+
+    def remove_stale_outputs(self, output_dirs: tp.Iterable[str]) -> tp.List[str]:
+        """
+        Removes outputs, generated in previous runs, that were not
+        generated (or kept) in this run. For example enum was removed
+        or file does not exist anymore. Directories, that become empty,
+        are removed too, up to `output_dirs`.
+        """
+        actual_outputs = set(self.outputs())
+        output_dirs = {os.path.abspath(output_dir) for output_dir in output_dirs}
+
+        removed = []
+        for output in self._previous_outputs:
+            if output in actual_outputs:
+                continue
+
+            if os.path.exists(output):
+                os.remove(output)
+            _remove_empty_directories(os.path.dirname(output), output_dirs)
+            removed.append(output)
+
+        return removed
+
+    def save(self):
+        # Only states of files, that are referenced by manifest
+        referenced_files = set(self.inputs())
+
+        data = {
+            "fingerprint": self._fingerprint,
+            "files": {
+                file_path: dataclasses.asdict(entry)
+                for file_path, entry in sorted(self._entries.items())
+            },
+            "file_states": {
+                file_path: state
+                for file_path, state in sorted(self._hasher.states.items())
+                if file_path in referenced_files
+            },
+        }
+
+        write_if_changed(self._path, json.dumps(data, indent=1))
+
+
+def _remove_empty_directories(directory: str, output_dirs: tp.Set[str]):
+    directory = os.path.abspath(directory)
+    while directory not in output_dirs and any(
+        directory.startswith(os.path.join(output_dir, "")) for output_dir in output_dirs
+    ):
+        try:
+            os.rmdir(directory)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            # Directory is not empty
+            return
+        directory = os.path.dirname(directory)
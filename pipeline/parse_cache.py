@@ -0,0 +1,85 @@
+import os
+import collections
+import typing as tp
+
+import clang.cindex
+
+from pipeline.parse_options import ParseOptions
+
+
+class _CachedTranslationUnit:
+    __slots__ = ("translation_unit", "file_states")
+
+    def __init__(
+        self,
+        translation_unit: clang.cindex.TranslationUnit,
+        file_states: tp.Dict[str, tp.Optional[tp.Tuple[int, int]]],
+    ):
+        self.translation_unit = translation_unit
+        # Path -> (mtime_ns, size) of parsed file and its includes
+        self.file_states = file_states
+
+
+def _file_state(path: str) -> tp.Optional[tp.Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    return stat.st_mtime_ns, stat.st_size
+
+
+class TranslationUnitCache:
+    """
+    Parses files with shared index and keeps up to `capacity` recently
+    parsed translation units (least recently used are disposed).
+    Cached translation unit is returned as is if none of its files
+    were changed, and is reparsed otherwise, which reuses precompiled
+    preamble if `PARSE_PRECOMPILED_PREAMBLE` flag is used.
+    Cache is useful only in long living processes (see `daemon.py`).
+    """
+
+    def __init__(self, index: clang.cindex.Index, capacity: int = 0):
+        self._index = index
+        self._capacity = capacity
+        # (path, parse args, parse flags) -> cached translation unit
+        self._entries: tp.OrderedDict[
+            tp.Tuple[str, tp.Tuple[str, ...], int], _CachedTranslationUnit
+        ] = collections.OrderedDict()
+
+    def parse(
+        self, file_path: str, parse_options: ParseOptions
+    ) -> clang.cindex.TranslationUnit:
+        if self._capacity <= 0:
+            return self._index.parse(
+                file_path,
+                parse_options.args,
+                options=parse_options.flags,
+            )
+
+        key = (os.path.abspath(file_path), tuple(parse_options.args), parse_options.flags)
+
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            translation_unit = self._index.parse(
+                file_path,
+                parse_options.args,
+                options=parse_options.flags,
+            )
+        else:
+            translation_unit = entry.translation_unit
+            if any(
+                _file_state(path) != state for path, state in entry.file_states.items()
+            ):
+                translation_unit.reparse()
+
+        file_states = {key[0]: _file_state(key[0])}
+        for inclusion in translation_unit.get_includes():
+            path = os.path.abspath(inclusion.include.name)
+            file_states[path] = _file_state(path)
+
+        self._entries[key] = _CachedTranslationUnit(translation_unit, file_states)
+        while len(self._entries) > self._capacity:
+            self._entries.popitem(last=False)
+
+        return translation_unit
@@ -0,0 +1,48 @@
+import dataclasses
+import typing as tp
+
+import clang.cindex
+
+# Arguments, passed to clang for every translation unit.
+# Comments are required to find annotations, everything else
+# just reduces amount of work done by clang.
+DEFAULT_PARSE_ARGS = [
+    "-fparse-all-comments",
+    "-fsyntax-only",
+    # Diagnostics are not used by generators
+    "-w",
+]
+
+
+@dataclasses.dataclass()
+class ParseOptions:
+    args: tp.List[str]
+    # `clang.cindex.TranslationUnit.PARSE_*` flags
+    flags: int
+
+    @classmethod
+    def from_args(cls, args, command_args: tp.Sequence[str] = ()) -> "ParseOptions":
+        """
+        `command_args` are arguments of file compile command (see
+        `CompilationDatabase`), `--clang_arg` arguments follow them.
+        """
+        flags = clang.cindex.TranslationUnit.PARSE_NONE
+
+        # Annotated declarations can't be located inside of function bodies
+        if not args.parse_function_bodies:
+            flags |= clang.cindex.TranslationUnit.PARSE_SKIP_FUNCTION_BODIES
+
+        # Headers are parsed as standalone translation units, so
+        # clang should not try to finalize them (instantiate templates, etc)
+        if not args.parse_complete:
+            flags |= clang.cindex.TranslationUnit.PARSE_INCOMPLETE
+
+        # Preamble (leading includes) is precompiled on first reparse
+        # and reused by next reparses of the same translation unit.
+        if args.precompiled_preamble:
+            flags |= clang.cindex.TranslationUnit.PARSE_PRECOMPILED_PREAMBLE
+
+        return cls(
+            args=DEFAULT_PARSE_ARGS + list(command_args) + (args.clang_arg or []),
+            flags=flags,
+        )
@@ -0,0 +1,20 @@
+import mmap
+
+CODEGEN_MARKER = "@cpp_codegen"
+
+_CODEGEN_MARKER_BYTES = CODEGEN_MARKER.encode()
+
+
+def contains_marker(path: str) -> bool:
+    """
+    Checks if file contains codegen marker without parsing it.
+    File is mapped into memory, so search is performed
+    without copying file content into python objects.
+    """
+    with open(path, "rb") as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return data.find(_CODEGEN_MARKER_BYTES) != -1
+        except ValueError:
+            # Empty files can not be mapped
+            return False
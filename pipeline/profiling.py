@@ -0,0 +1,221 @@
+import os
+import json
+import time
+import contextlib
+import dataclasses
+import typing as tp
+
+
+@dataclasses.dataclass()
+class PhaseTiming:
+    wall: float = 0.0
+    cpu: float = 0.0
+    count: int = 0
+
+
+# Events are created for every parsed file, generated declaration
+# and written file, and are sent from worker processes.
+@dataclasses.dataclass()
+class TraceEvent:
+    __slots__ = ("name", "start", "wall", "cpu", "pid", "args")
+
+    name: str
+    # `time.perf_counter()` at the beginning of event. It is
+    # system wide monotonic clock, so values of different
+    # processes are comparable.
+    start: float
+    wall: float
+    cpu: float
+    pid: int
+    args: tp.Dict[str, tp.Any]
+
+
+class Stopwatch:
+    """
+    Measures wall and CPU (of current process) time between laps.
+    """
+
+    def __init__(self):
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+
+    @property
+    def start(self) -> float:
+        """
+        Wall time of previous lap.
+        """
+        return self._wall
+
+    def lap(self) -> tp.Tuple[float, float]:
+        wall = time.perf_counter()
+        cpu = time.process_time()
+
+        result = (wall - self._wall, cpu - self._cpu)
+        self._wall = wall
+        self._cpu = cpu
+
+        return result
+
+
+class Profiler:
+    """
+    Accumulates wall and CPU time of pipeline phases and keeps
+    every measured event for trace output.
+    Phases, executed in worker processes, are measured there
+    and added with `add`.
+    """
+
+    def __init__(self):
+        self._phases: tp.Dict[str, PhaseTiming] = {}
+        self._events: tp.List[TraceEvent] = []
+
+    @property
+    def phases(self) -> tp.Dict[str, PhaseTiming]:
+        return self._phases
+
+    @property
+    def events(self) -> tp.List[TraceEvent]:
+        return self._events
+
+    def record(self, name: str, wall: float, cpu: float):
+        phase = self._phases.setdefault(name, PhaseTiming())
+        phase.wall += wall
+        phase.cpu += cpu
+        phase.count += 1
+
+    def add(self, event: TraceEvent):
+        self.record(event.name, event.wall, event.cpu)
+        self._events.append(event)
+
+    def lap(self, name: str, stopwatch: Stopwatch, **args):
+        """
+        Adds event, that lasted since previous lap of `stopwatch`.
+        """
+        start = stopwatch.start
+        wall, cpu = stopwatch.lap()
+        self.add(TraceEvent(name, start, wall, cpu, os.getpid(), args))
+
+    @contextlib.contextmanager
+    def phase(self, name: str, **args):
+        stopwatch = Stopwatch()
+        try:
+            yield
+        finally:
+            self.lap(name, stopwatch, **args)
+
+    def write_trace(self, path: str):
+        """
+        Writes events in Chrome trace event format
+        (chrome://tracing, https://ui.perfetto.dev).
+        """
+        origin = min((event.start for event in self._events), default=0.0)
+
+        trace_events = [
+            {
+                "name": event.name,
+                "cat": event.name,
+                "ph": "X",
+                "ts": round((event.start - origin) * 1e6, 3),
+                "dur": round(event.wall * 1e6, 3),
+                "pid": event.pid,
+                "tid": event.pid,
+                "args": dict(event.args, cpu_ms=round(event.cpu * 1e3, 3)),
+            }
+            for event in self._events
+        ]
+
+        with open(path, "w") as f:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f)
+
+    def self_phases(self) -> tp.Dict[str, PhaseTiming]:
+        """
+        Timings of phases without time of events, nested into them
+        (for example renders and writes of generated declaration),
+        so timings of different phases don't overlap.
+        """
+        result: tp.Dict[str, PhaseTiming] = {}
+
+        events_by_pid: tp.Dict[int, tp.List[TraceEvent]] = {}
+        for event in self._events:
+            events_by_pid.setdefault(event.pid, []).append(event)
+
+        for events in events_by_pid.values():
+            # Enclosing events are sorted before events, nested into them
+            events.sort(key=lambda event: (event.start, -event.wall))
+
+            enclosing_events: tp.List[TraceEvent] = []
+            for event in events:
+                phase = result.setdefault(event.name, PhaseTiming())
+                phase.wall += event.wall
+                phase.cpu += event.cpu
+                phase.count += 1
+
+                end = event.start + event.wall
+                while enclosing_events and (
+                    enclosing_events[-1].start + enclosing_events[-1].wall < end - 1e-9
+                ):
+                    enclosing_events.pop()
+
+                if enclosing_events:
+                    parent = result[enclosing_events[-1].name]
+                    parent.wall -= event.wall
+                    parent.cpu -= event.cpu
+
+                enclosing_events.append(event)
+
+        return result
+
+    def summary(self, top: int = 10) -> tp.List[str]:
+        """
+        Returns lines with self time split per phase and
+        the slowest files and declarations.
+        """
+        phases = self.self_phases()
+        total_wall = sum(phase.wall for phase in phases.values())
+
+        lines = [f"{'Phase':12} {'self wall, s':>12} {'share':>8} {'self cpu, s':>12} {'count':>8}"]
+        for name, phase in sorted(phases.items(), key=lambda item: -item[1].wall):
+            share = 100.0 * phase.wall / total_wall if total_wall > 0 else 0.0
+            lines.append(
+                f"{name:12} {phase.wall:12.3f} {share:7.1f}% {phase.cpu:12.3f} {phase.count:8}"
+            )
+
+        for title, key, names in (
+            ("files", "file", ("parse", "traversal")),
+            ("declarations", "declaration", ("generate",)),
+        ):
+            totals: tp.Dict[str, float] = {}
+            for event in self._events:
+                if event.name in names and key in event.args:
+                    value = event.args[key]
+                    totals[value] = totals.get(value, 0.0) + event.wall
+
+            if not totals:
+                continue
+
+            lines.append(f"Slowest {title}:")
+            for value, wall in sorted(totals.items(), key=lambda item: -item[1])[:top]:
+                lines.append(f"{wall:9.3f}s {value}")
+
+        return lines
+
+
+# Profiler of current process, used by code that has no access
+# to pipeline state (generators, file writes).
+_ACTIVE_PROFILER: tp.Optional[Profiler] = None
+
+
+def set_active_profiler(profiler: tp.Optional[Profiler]):
+    global _ACTIVE_PROFILER
+    _ACTIVE_PROFILER = profiler
+
+
+def span(name: str, **args) -> tp.ContextManager:
+    """
+    Measures event with active profiler. Does nothing if
+    there is no active profiler.
+    """
+    if _ACTIVE_PROFILER is None:
+        return contextlib.nullcontext()
+
+    return _ACTIVE_PROFILER.phase(name, **args)
@@ -0,0 +1,61 @@
+import os
+import glob
+import zlib
+import typing as tp
+
+from generators.file_utils import write_if_changed
+
+# Converter implementations, that are compiled as a part of shard
+FRAGMENT_EXTENSION = ".ipp"
+
+SHARD_FILE_PREFIX = "shard_"
+
+
+def shard_index(fragment: str, shards_count: int) -> int:
+    """
+    Shard of fragment depends only on its path (relative to
+    output source directory), so adding or removing fragment
+    doesn't move other fragments to other shards.
+    """
+    return zlib.crc32(fragment.encode()) % shards_count
+
+
+def shard_path(source_dir: str, index: int) -> str:
+    return os.path.join(source_dir, f"{SHARD_FILE_PREFIX}{index:02d}.cpp")
+
+
+def write_shards(
+    source_dir: str,
+    fragments: tp.Iterable[str],
+    shards_count: int,
+) -> tp.List[str]:
+    """
+    Writes `shards_count` unity sources into `source_dir`, that include
+    fragments. All shards are written, even empty ones, so set of sources
+    doesn't change when fragments are added. Only changed shards are
+    rewritten and recompiled. Shards of other `shards_count` are removed.
+
+    Returns paths of shards.
+    """
+    source_dir = os.path.abspath(source_dir)
+
+    shard_fragments: tp.List[tp.List[str]] = [[] for _ in range(shards_count)]
+    for fragment in fragments:
+        fragment = os.path.relpath(os.path.abspath(fragment), source_dir)
+        shard_fragments[shard_index(fragment, shards_count)].append(fragment)
+
+    shards = []
+    for index, included_fragments in enumerate(shard_fragments):
+        path = shard_path(source_dir, index)
+        write_if_changed(
+            path,
+            "// Generated by cpp-codegen, do not edit\n"
+            + "".join(f'#include "{fragment}"\n' for fragment in sorted(included_fragments)),
+        )
+        shards.append(path)
+
+    for path in glob.glob(os.path.join(source_dir, f"{SHARD_FILE_PREFIX}*.cpp")):
+        if path not in shards:
+            os.remove(path)
+
+    return shards
@@ -0,0 +1,100 @@
+import os
+import json
+import typing as tp
+
+# Module is imported before any heavy module (clang, jinja2), so
+# it depends only on standard modules, that are cheap to import.
+
+STAMP_FILE_NAME = ".cpp_codegen_stamp.json"
+STAMP_VERSION = 1
+
+# Arguments, that don't affect generated files
+_IGNORED_ARGUMENTS = {"force_regenerate", "profile", "watch", "watch_poll_interval"}
+
+
+def _mtime(path: str) -> tp.Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def snapshot(paths: tp.Iterable[str]) -> tp.Dict[str, tp.Optional[int]]:
+    """
+    Modification times of `paths`.
+    """
+    return {path: _mtime(path) for path in paths}
+
+
+def make_key(args) -> str:
+    """
+    Arguments of run. Paths may be relative, so
+    working directory is a part of key too.
+    """
+    values = {
+        name: value
+        for name, value in vars(args).items()
+        if name not in _IGNORED_ARGUMENTS
+    }
+    return json.dumps([os.getcwd(), values], sort_keys=True)
+
+
+def touch(path: str):
+    with open(path, "a"):
+        pass
+    os.utime(path, None)
+
+
+def is_up_to_date(path: str, key: str) -> bool:
+    """
+    Checks that generation with the same `key` (arguments) was
+    performed and neither directories, nor files, recorded by
+    `save`, were modified since then. Only `stat` calls are made,
+    input files are not read.
+    """
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    if data.get("version") != STAMP_VERSION or data.get("key") != key:
+        return False
+
+    # Modification time of directory changes when files are added,
+    # removed or renamed in it
+    for paths in (data["directories"], data["files"]):
+        for recorded_path, mtime in paths.items():
+            if _mtime(recorded_path) != mtime:
+                return False
+
+    return all(os.path.exists(output) for output in data["outputs"])
+
+
+def save(
+    path: str,
+    key: str,
+    directories: tp.Dict[str, tp.Optional[int]],
+    files: tp.Dict[str, tp.Optional[int]],
+    outputs: tp.Iterable[str],
+):
+    """
+    Records modification times of directories and files, taken
+    with `snapshot`. Project files should be taken before they are
+    parsed, so files, changed during generation, are processed
+    by next run.
+    """
+    data = {
+        "version": STAMP_VERSION,
+        "key": key,
+        "directories": dict(sorted(directories.items())),
+        "files": dict(sorted(files.items())),
+        "outputs": sorted(set(outputs)),
+    }
+
+    # Stamp is saved after generation, so writing
+    # utilities are imported only here
+    from generators.file_utils import write_if_changed
+
+    # Interrupted run doesn't leave truncated stamp
+    write_if_changed(path, json.dumps(data, indent=1))
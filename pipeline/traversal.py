@@ -0,0 +1,91 @@
+import os
+import ctypes
+import collections
+import typing as tp
+
+import clang.cindex
+
+from pipeline.prefilter import CODEGEN_MARKER
+
+# Kinds of nodes, that can contain annotated declarations.
+# Walker does not descend into any other nodes (function bodies,
+# templates, expressions, etc.).
+CONTAINER_KINDS = {
+    clang.cindex.CursorKind.TRANSLATION_UNIT,
+    clang.cindex.CursorKind.NAMESPACE,
+    clang.cindex.CursorKind.CLASS_DECL,
+    clang.cindex.CursorKind.STRUCT_DECL,
+    clang.cindex.CursorKind.LINKAGE_SPEC,
+    # Older libclang versions expose `extern "C"` blocks as unexposed declarations
+    clang.cindex.CursorKind.UNEXPOSED_DECL,
+}
+
+
+def _is_from_main_file(cursor: clang.cindex.Cursor) -> bool:
+    # `clang_Location_isFromMainFile` is not registered by python bindings
+    function = clang.cindex.conf.lib.clang_Location_isFromMainFile
+    if function.argtypes is None:
+        function.argtypes = [clang.cindex.SourceLocation]
+        function.restype = ctypes.c_int
+
+    return function(cursor.location) != 0
+
+
+def walk_annotated_declarations(
+    cursor: clang.cindex.Cursor,
+    visit_included_file: tp.Optional[tp.Callable[[str], bool]] = None,
+    kinds: tp.Optional[tp.Container[clang.cindex.CursorKind]] = None,
+) -> tp.Iterator[tp.Tuple[clang.cindex.Cursor, str, str]]:
+    """
+    Yields nodes of translation unit main file with codegen
+    marker in their comment along with that comment and
+    absolute path of file, where node is located.
+    If `kinds` are passed, comments are fetched (and nodes
+    are yielded) only for nodes of these kinds.
+    Nodes are visited in breadth-first order. Subtrees from
+    included files are skipped, unless `visit_included_file`
+    returns `True` for absolute path of included file.
+    """
+    main_file_path = os.path.abspath(cursor.spelling)
+
+    # Included file name -> absolute path if file has to be visited
+    included_files: tp.Dict[str, tp.Optional[str]] = {}
+
+    nodes_to_visit: tp.Deque[clang.cindex.Cursor] = collections.deque(
+        cursor.get_children()
+    )
+
+    while nodes_to_visit:
+        current_node = nodes_to_visit.popleft()
+
+        if _is_from_main_file(current_node):
+            node_file_path = main_file_path
+        elif visit_included_file is None:
+            continue
+        else:
+            node_file = current_node.location.file
+            if node_file is None:
+                continue
+
+            node_file_name = node_file.name
+            if node_file_name not in included_files:
+                included_file_path = os.path.abspath(node_file_name)
+                included_files[node_file_name] = (
+                    included_file_path
+                    if visit_included_file(included_file_path)
+                    else None
+                )
+
+            node_file_path = included_files[node_file_name]
+            if node_file_path is None:
+                continue
+
+        node_kind = current_node.kind
+
+        if kinds is None or node_kind in kinds:
+            node_comment = current_node.raw_comment
+            if node_comment is not None and CODEGEN_MARKER in node_comment:
+                yield current_node, node_comment, node_file_path
+
+        if node_kind in CONTAINER_KINDS:
+            nodes_to_visit.extend(current_node.get_children())
@@ -0,0 +1,287 @@
+import os
+import abc
+import sys
+import time
+import errno
+import ctypes
+import ctypes.util
+import select
+import struct
+import logging
+import typing as tp
+
+from pipeline import stamp
+from pipeline.file_index import FileIndex, PathMatcher
+from pipeline.generation import HEADER_EXTENSIONS, SOURCE_EXTENSIONS, Session, generate
+
+logger = logging.getLogger(__name__)
+
+# Translation units of all annotated files are kept in memory, so
+# changed files and files, that include them, are reparsed
+TRANSLATION_UNITS_CAPACITY = 1024
+
+# Editors write file in several steps (truncate, write, rename), events
+# are collected until there are none for this time (in seconds)
+DEBOUNCE_INTERVAL = 0.05
+
+_WATCHED_EXTENSIONS = SOURCE_EXTENSIONS | HEADER_EXTENSIONS
+
+# See `inotify(7)`
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = os.O_CLOEXEC
+
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+)
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class Watcher(abc.ABC):
+    """
+    Reports project files, that were created, changed or removed.
+    Output directories and directories, ignored entirely, are not watched.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        ignore_globs: tp.Optional[tp.List[str]],
+        pruned_directories: tp.Iterable[str],
+    ):
+        self._root = root
+        self._ignore_globs = ignore_globs
+        self._matcher = PathMatcher(ignore_globs)
+        self._pruned_directories = {os.path.abspath(path) for path in pruned_directories}
+
+    def _is_watched_directory(self, path: str) -> bool:
+        return (
+            os.path.basename(path) not in {".git", ".hg", ".svn"}
+            and os.path.abspath(path) not in self._pruned_directories
+            and not self._matcher.matches_directory(path)
+        )
+
+    def _is_watched_file(self, path: str) -> bool:
+        return (
+            os.path.splitext(path)[1] in _WATCHED_EXTENSIONS
+            and not self._matcher.matches_file(path)
+        )
+
+    def _project_files(self) -> tp.List[str]:
+        return FileIndex(
+            self._root,
+            _WATCHED_EXTENSIONS,
+            self._ignore_globs,
+            self._pruned_directories,
+        ).scan()
+
+    @abc.abstractmethod
+    def wait(self) -> tp.Set[str]:
+        """
+        Blocks until some of project files are changed
+        and returns their paths.
+        """
+        pass
+
+    def close(self):
+        pass
+
+
+class PollingWatcher(Watcher):
+    """
+    Compares modification times of project files every `interval` seconds.
+    """
+
+    def __init__(self, *args, interval: float, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._interval = interval
+        self._states = stamp.snapshot(self._project_files())
+
+    def wait(self) -> tp.Set[str]:
+        while True:
+            time.sleep(self._interval)
+
+            states = stamp.snapshot(self._project_files())
+            changed = {
+                path
+                for path in self._states.keys() | states.keys()
+                if self._states.get(path) != states.get(path)
+            }
+            self._states = states
+
+            if changed:
+                return changed
+
+
+class InotifyWatcher(Watcher):
+    """
+    Watches every project directory with inotify.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._libc = _load_libc()
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        # Watch descriptor -> directory
+        self._directories: tp.Dict[int, str] = {}
+        self._add_directory(self._root)
+
+    def close(self):
+        os.close(self._fd)
+
+    def _add_directory(self, directory: str) -> tp.Set[str]:
+        """
+        Watches `directory` and its subdirectories. Returns files,
+        found in them: they may be created before watch is added.
+        """
+        files = set()
+        for dirpath, dirnames, filenames in os.walk(directory):
+            dirnames[:] = [
+                name for name in dirnames if self._is_watched_directory(os.path.join(dirpath, name))
+            ]
+
+            descriptor = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), _WATCH_MASK)
+            if descriptor < 0:
+                error = ctypes.get_errno()
+                # Directory may be removed during walk
+                if error in (errno.ENOENT, errno.ENOTDIR):
+                    continue
+                raise OSError(error, f"Unable to watch '{dirpath}'")
+            self._directories[descriptor] = dirpath
+
+            files.update(
+                os.path.join(dirpath, name)
+                for name in filenames
+                if self._is_watched_file(os.path.join(dirpath, name))
+            )
+
+        return files
+
+    def _read_events(self) -> tp.Set[str]:
+        changed = set()
+
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+
+            offset = 0
+            while offset < len(data):
+                descriptor, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+                offset += length
+
+                if mask & _IN_Q_OVERFLOW:
+                    # Events were lost, all files are checked by generation
+                    logger.warning("Inotify queue overflowed")
+                    changed.add(self._root)
+                    continue
+
+                directory = self._directories.get(descriptor)
+                if directory is None:
+                    continue
+
+                if mask & _IN_DELETE_SELF:
+                    del self._directories[descriptor]
+                    continue
+
+                path = os.path.join(directory, name)
+                if mask & _IN_ISDIR:
+                    if mask & (_IN_CREATE | _IN_MOVED_TO) and self._is_watched_directory(path):
+                        changed.update(self._add_directory(path))
+                    elif mask & _IN_MOVED_FROM:
+                        # Files of moved away directory are removed from project
+                        changed.add(path)
+                elif self._is_watched_file(path):
+                    changed.add(path)
+
+    def wait(self) -> tp.Set[str]:
+        changed: tp.Set[str] = set()
+        while True:
+            ready, _, _ = select.select([self._fd], [], [], DEBOUNCE_INTERVAL if changed else None)
+            if not ready:
+                return changed
+
+            changed.update(self._read_events())
+
+
+def _load_libc() -> ctypes.CDLL:
+    libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+
+    libc.inotify_init1.argtypes = [ctypes.c_int]
+    libc.inotify_init1.restype = ctypes.c_int
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    libc.inotify_add_watch.restype = ctypes.c_int
+
+    return libc
+
+
+def create_watcher(args) -> Watcher:
+    watcher_args = (
+        args.project_dir,
+        args.ignore_path_glob,
+        (args.output_include_dir, args.output_source_dir),
+    )
+
+    if args.watch_poll_interval is None and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(*watcher_args)
+        except (OSError, AttributeError) as e:
+            # Limit of watches may be exceeded, libc may lack inotify
+            logger.warning("Unable to use inotify (%s), falling back to polling", e)
+
+    return PollingWatcher(*watcher_args, interval=args.watch_poll_interval or 0.5)
+
+
+def watch(args, profiler=None):
+    """
+    Generates files and regenerates them after every change of project
+    files until interrupted. Only changed files and files, that include
+    them, are reparsed in this process, with translation units, kept
+    between generations.
+    """
+    session = Session(TRANSLATION_UNITS_CAPACITY)
+    watcher = create_watcher(args)
+    logger.info("Watching '%s' with %s", args.project_dir, type(watcher).__name__)
+
+    # Everything is checked by the first generation
+    changed: tp.Optional[tp.Set[str]] = None
+
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                generate(args, profiler, session, changed)
+            except Exception:
+                # Broken file shouldn't stop watching, it will be fixed
+                logger.exception("Generation failed")
+            else:
+                logger.info("Generated in %.3f seconds", time.perf_counter() - start)
+
+            changed = watcher.wait()
+            logger.info("%d files changed, regenerating", len(changed))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
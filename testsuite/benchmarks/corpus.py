@@ -0,0 +1,131 @@
+import os
+import random
+import dataclasses
+import typing as tp
+
+
+@dataclasses.dataclass()
+class CorpusConfig:
+    # Amount of headers, every header has paired source file
+    files: int = 50
+    # Enums per header
+    annotated_enums: int = 2
+    unannotated_enums: int = 2
+    enumerators: int = 16
+    # Length of include chain between headers (0 - headers include nothing)
+    include_depth: int = 2
+    # Probability of plain comment on enumerator and enum
+    comment_density: float = 0.5
+    seed: int = 0
+
+
+_ANNOTATION = """/**
+ * @brief Annotated enumeration.
+ * @cpp_codegen
+ * string_serialization
+ * json_serialization
+ * string_deserialization
+ * json_deserialization
+ */"""
+
+
+def _header_name(index: int) -> str:
+    return f"header_{index:04d}.hpp"
+
+
+def _source_name(index: int) -> str:
+    return f"source_{index:04d}.cpp"
+
+
+def _render_enum(
+    config: CorpusConfig,
+    rng: random.Random,
+    name: str,
+    annotated: bool,
+) -> tp.List[str]:
+    lines = []
+    if annotated:
+        lines.append(_ANNOTATION)
+    elif rng.random() < config.comment_density:
+        lines.append(f"/**\n * @brief Plain enumeration {name}.\n */")
+
+    lines.append(f"enum class {name} {{")
+    for enumerator_index in range(config.enumerators):
+        enumerator = f"{name}_value_{enumerator_index}"
+        line = f"    {enumerator} = {enumerator_index * 2},"
+        if rng.random() < config.comment_density:
+            # Comments of annotated enumerators are custom conversion values
+            if annotated:
+                line += f' //< "{enumerator}_str"s "{enumerator}_json"json'
+            else:
+                line += f" //< Plain enumerator {enumerator}"
+        lines.append(line)
+    lines.append("};")
+    lines.append("")
+
+    return lines
+
+
+def _render_header(config: CorpusConfig, rng: random.Random, index: int) -> str:
+    lines = ["#pragma once", ""]
+
+    # Headers form chains `include_depth` long, so every header
+    # except chain head includes previous one
+    if config.include_depth > 0 and index % (config.include_depth + 1) != 0:
+        lines.append(f'#include "{_header_name(index - 1)}"')
+        lines.append("")
+
+    lines.append(f"namespace corpus::file_{index} {{")
+    lines.append("")
+
+    # Output files are named by enum, so names are unique across files
+    for enum_index in range(config.annotated_enums):
+        lines += _render_enum(config, rng, f"annotated_{index}_{enum_index}", annotated=True)
+
+    for enum_index in range(config.unannotated_enums):
+        lines += _render_enum(config, rng, f"plain_{index}_{enum_index}", annotated=False)
+
+    lines.append("}")
+    lines.append("")
+
+    return "\n".join(lines)
+
+
+def _render_source(index: int) -> str:
+    return "\n".join(
+        [
+            f'#include "{_header_name(index)}"',
+            "",
+            f"namespace corpus::file_{index} {{",
+            "int function() { return 0; }",
+            "}",
+            "",
+        ]
+    )
+
+
+def generate_corpus(config: CorpusConfig, project_dir: str) -> tp.List[str]:
+    """
+    Writes synthetic project into `project_dir` and
+    returns paths of created files.
+    """
+    rng = random.Random(config.seed)
+
+    include_dir = os.path.join(project_dir, "include")
+    source_dir = os.path.join(project_dir, "src")
+    os.makedirs(include_dir, exist_ok=True)
+    os.makedirs(source_dir, exist_ok=True)
+
+    paths = []
+    for index in range(config.files):
+        header_path = os.path.join(include_dir, _header_name(index))
+        with open(header_path, "w") as f:
+            f.write(_render_header(config, rng, index))
+
+        source_path = os.path.join(source_dir, _source_name(index))
+        with open(source_path, "w") as f:
+            f.write(_render_source(index))
+
+        paths += [header_path, source_path]
+
+    return paths
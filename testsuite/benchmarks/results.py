@@ -0,0 +1,160 @@
+import json
+import typing as tp
+
+# Results of benchmark entry: metric -> value
+Metrics = tp.Dict[str, float]
+
+
+def add_arguments(parser, metric: str):
+    """
+    Arguments of repeated runs, results file and baseline comparison,
+    shared by benchmark scripts.
+    """
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Amount of runs of every scenario, the fastest run is reported",
+    )
+
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Path of JSON file with results",
+    )
+
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        default=None,
+        help="Path of JSON file with baseline results, results are compared if it's passed. "
+        "Timings depend on machine, so baseline is recorded on the machine, that compares.",
+    )
+
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help=f"Allowed relative slowdown of {metric} compared to baseline",
+    )
+
+    parser.add_argument(
+        "--update_baseline",
+        action="store_true",
+        help="Writes results as new baseline instead of comparing",
+    )
+
+
+def merge_fastest(result: Metrics, metrics: Metrics):
+    """
+    Keeps the best value of every metric of repeated runs: the lowest
+    time or the highest throughput (`*_per_second` metrics).
+    """
+    for metric, value in metrics.items():
+        if metric not in result:
+            result[metric] = value
+        elif metric.endswith("_per_second"):
+            result[metric] = max(result[metric], value)
+        else:
+            result[metric] = min(result[metric], value)
+
+
+def print_results(entries: tp.Dict[str, Metrics], metrics: tp.Sequence[str], unit: str = ""):
+    for name, values in sorted(entries.items()):
+        for metric in metrics:
+            if metric in values:
+                print(f"{name:32} {metric:24} {values[metric]:12.3f}{unit}")
+
+
+def compare(
+    entries: tp.Dict[str, Metrics],
+    baseline_entries: tp.Dict[str, Metrics],
+    metrics: tp.Sequence[str],
+    threshold: float,
+    unit: str = "",
+    min_compared_value: float = 0.0,
+) -> bool:
+    """
+    Compares lower-is-better `metrics` of entries with baseline. Values,
+    lower than `min_compared_value`, are mostly noise and never regress.
+    """
+    succeeded = True
+    for name, values in sorted(entries.items()):
+        baseline_values = baseline_entries.get(name, {})
+        for metric in metrics:
+            if metric not in values:
+                continue
+
+            value = values[metric]
+            baseline_value = baseline_values.get(metric)
+            if baseline_value is None:
+                print(f"{name:32} {metric:24} {value:12.3f}{unit} (new)")
+                continue
+
+            ratio = value / max(baseline_value, 1e-9)
+            regressed = value >= min_compared_value and ratio > 1.0 + threshold
+            print(
+                f"{name:32} {metric:24} {value:12.3f}{unit} "
+                f"baseline {baseline_value:12.3f}{unit} "
+                f"({ratio:5.2f}x){' REGRESSION' if regressed else ''}"
+            )
+            succeeded &= not regressed
+
+    return succeeded
+
+
+def report(
+    args,
+    results: dict,
+    parameters: tp.Sequence[str],
+    entries_of: tp.Callable[[dict], tp.Dict[str, Metrics]],
+    printed_metrics: tp.Sequence[str],
+    compared_metrics: tp.Sequence[str],
+    unit: str = "",
+    min_compared_value: float = 0.0,
+) -> int:
+    """
+    Writes results (and baseline), prints them or compares them with baseline,
+    passed by arguments of `add_arguments`. Results are compared only if
+    their `parameters` are the same as baseline ones.
+
+    Returns exit code of benchmark script.
+    """
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=1)
+
+    if args.update_baseline:
+        if args.baseline is None:
+            print("Path of baseline is not passed")
+            return 1
+
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=1)
+        return 0
+
+    if args.baseline is None:
+        print_results(entries_of(results), printed_metrics, unit)
+        return 0
+
+    try:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"Baseline '{args.baseline}' does not exist, comparison is skipped")
+        return 0
+
+    if any(results[parameter] != baseline.get(parameter) for parameter in parameters):
+        print("Benchmark parameters differ from baseline, comparison is skipped")
+        return 0
+
+    succeeded = compare(
+        entries_of(results),
+        entries_of(baseline),
+        compared_metrics,
+        args.threshold,
+        unit,
+        min_compared_value,
+    )
+    return 0 if succeeded else 1
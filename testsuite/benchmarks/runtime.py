@@ -0,0 +1,165 @@
+import os
+import dataclasses
+import typing as tp
+
+from generators.file_utils import write_if_changed
+
+HARNESS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+NAMESPACE = "runtime_benchmark::cases"
+
+# Conversions, that are measured, and their annotation lines
+CONVERSIONS = {
+    "to_string": "string_serialization",
+    "to_json": "json_serialization",
+}
+
+# Conversion -> its functor in `runtime_harness.hpp`
+_HARNESS_CONVERSIONS = {
+    "to_string": "ToString",
+    "to_json": "ToJson",
+}
+
+
+@dataclasses.dataclass()
+class RuntimeCase:
+    # Lookup, that generator is expected to choose for enum:
+    # `array`, `switch` or `map` (see `LookupTable.backend`)
+    lookup: str
+    size: int
+    # Numeric values are `first`, `first + step`, ...
+    first: int
+    step: int
+
+    @property
+    def name(self) -> str:
+        return f"{self.lookup}_{self.size}"
+
+
+# `--conversion_backend` of project -> lookups, generated in it. Contiguous
+# values are converted with array, values with gaps - with `switch`.
+BACKEND_LOOKUPS = {
+    "switch": {"array": 1, "switch": 3},
+    "map": {"map": 1},
+}
+
+
+def backend_cases(backend: str, sizes: tp.Iterable[int]) -> tp.List[RuntimeCase]:
+    return [
+        RuntimeCase(lookup=lookup, size=size, first=0, step=step)
+        for lookup, step in BACKEND_LOOKUPS[backend].items()
+        for size in sizes
+    ]
+
+
+def _render_enum(case: RuntimeCase) -> tp.List[str]:
+    lines = [
+        "/**",
+        " * @cpp_codegen",
+        *(f" * {annotation}" for annotation in CONVERSIONS.values()),
+        " */",
+        f"enum class {case.name} {{",
+    ]
+    for index in range(case.size):
+        lines.append(f"    {case.name}_value_{index} = {case.first + index * case.step},")
+    lines.append("};")
+    lines.append("")
+
+    return lines
+
+
+def _render_header(cases: tp.List[RuntimeCase]) -> str:
+    lines = ["#pragma once", "", f"namespace {NAMESPACE} {{", ""]
+    for case in cases:
+        lines += _render_enum(case)
+    lines.append("}")
+    lines.append("")
+
+    return "\n".join(lines)
+
+
+def _render_main(cases: tp.List[RuntimeCase]) -> str:
+    lines = [
+        '#include "runtime_harness.hpp"',
+        '#include "cases.hpp"',
+        "",
+    ]
+    # Converters are generated into header per enum
+    lines += [f"#include <converters/{case.name}.hpp>" for case in cases]
+    lines += [
+        "",
+        "int main(int argc, char** argv) {",
+        "    runtime_benchmark::Options options;",
+        "    if (!runtime_benchmark::parse_options(argc, argv, options)) {",
+        '        std::fprintf(stderr, "Usage: %s cold|hot|contended <iterations> <threads>\\n", argv[0]);',
+        "        return 2;",
+        "    }",
+        "",
+    ]
+    for case in cases:
+        case_type = f"{NAMESPACE}::{case.name}"
+        lines.append(
+            f"    const runtime_benchmark::Case<{case_type}> {case.name}_case{{"
+            f'"{case.name}", {case.size}, {case.first}, {case.step}}};'
+        )
+        for conversion_type in _HARNESS_CONVERSIONS.values():
+            lines.append(
+                f"    runtime_benchmark::run<runtime_benchmark::{conversion_type}>"
+                f"({case.name}_case, options);"
+            )
+    lines += [
+        "",
+        "    return runtime_benchmark::sink.load() == 0 ? 1 : 0;",
+        "}",
+        "",
+    ]
+
+    return "\n".join(lines)
+
+
+def _render_cmake_lists(generated_dir: str) -> str:
+    return "\n".join(
+        [
+            "cmake_minimum_required(VERSION 3.12)",
+            "project(runtime_benchmark CXX)",
+            "",
+            "find_package(nlohmann_json CONFIG REQUIRED)",
+            "find_package(Threads REQUIRED)",
+            "",
+            f"file(GLOB_RECURSE GENERATED_SOURCES {generated_dir}/src/*.cpp)",
+            "",
+            "add_executable(${PROJECT_NAME} main.cpp ${GENERATED_SOURCES})",
+            "",
+            "target_include_directories(${PROJECT_NAME}",
+            "  PRIVATE",
+            "    include",
+            f"    {generated_dir}/include",
+            f"    {HARNESS_DIR}",
+            ")",
+            "",
+            "target_link_libraries(${PROJECT_NAME}",
+            "  PRIVATE",
+            "    nlohmann_json::nlohmann_json",
+            "    Threads::Threads",
+            ")",
+            "",
+            "target_compile_features(${PROJECT_NAME} PRIVATE cxx_std_17)",
+            "",
+        ]
+    )
+
+
+def generate_project(cases: tp.List[RuntimeCase], project_dir: str, generated_dir: str):
+    """
+    Writes benchmark project into `project_dir`. Converters of its
+    enums are expected to be generated into `generated_dir`.
+    Unchanged files are not rewritten, so they are not rebuilt.
+    """
+    include_dir = os.path.join(project_dir, "include")
+    os.makedirs(include_dir, exist_ok=True)
+
+    write_if_changed(os.path.join(include_dir, "cases.hpp"), _render_header(cases))
+    write_if_changed(os.path.join(project_dir, "main.cpp"), _render_main(cases))
+    write_if_changed(
+        os.path.join(project_dir, "CMakeLists.txt"), _render_cmake_lists(generated_dir)
+    )
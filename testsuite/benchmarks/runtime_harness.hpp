@@ -0,0 +1,219 @@
+#pragma once
+
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <cstdint>
+#include <cstdio>
+#include <cstdlib>
+#include <random>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include <nlohmann/json.hpp>
+
+// Measures conversions, generated for benchmark enums. Every mode is
+// executed by separate process, so static data of conversions is
+// initialized by the first measured call of `cold` and `contended` modes.
+// Results are printed as JSON object per line.
+namespace runtime_benchmark {
+
+using Clock = ::std::chrono::steady_clock;
+
+struct Options {
+    ::std::string mode;
+    ::std::size_t iterations = 0;
+    unsigned threads = 1;
+};
+
+inline ::std::int64_t elapsed_ns(Clock::time_point start) {
+    return ::std::chrono::duration_cast<::std::chrono::nanoseconds>(Clock::now() - start).count();
+}
+
+// Results of conversions are accumulated, so calls are not optimized out
+inline ::std::atomic<::std::size_t> sink{0};
+
+struct ToString {
+    static constexpr const char* name = "to_string";
+
+    template <typename Enum>
+    ::std::size_t operator()(Enum value) {
+        return to_string(value).size();
+    }
+};
+
+struct ToJson {
+    static constexpr const char* name = "to_json";
+
+    template <typename Enum>
+    ::std::size_t operator()(Enum value) {
+        json = value;
+        return json.template get_ref<const ::std::string&>().size();
+    }
+
+    ::nlohmann::json json;
+};
+
+// Enum with `size` values: `first`, `first + step`, ...
+template <typename Enum>
+struct Case {
+    const char* name;
+    ::std::size_t size;
+    long long first;
+    long long step;
+
+    Enum value(::std::size_t index) const {
+        return static_cast<Enum>(first + static_cast<long long>(index) * step);
+    }
+
+    // Values are visited in shuffled order, so `switch` branches
+    // are not trivially predicted
+    ::std::vector<Enum> shuffled_values() const {
+        ::std::vector<Enum> values;
+        const auto count = ::std::max<::std::size_t>(size, 1024);
+        values.reserve(count);
+        for (::std::size_t index = 0; index < count; ++index) {
+            values.push_back(value(index % size));
+        }
+
+        ::std::mt19937 random(size);
+        ::std::shuffle(values.begin(), values.end(), random);
+        return values;
+    }
+};
+
+inline void report(
+    const char* case_name,
+    const char* conversion,
+    const char* mode,
+    ::std::size_t calls,
+    ::std::int64_t total_ns,
+    ::std::int64_t first_call_ns) {
+    ::std::printf(
+        "{\"case\": \"%s\", \"conversion\": \"%s\", \"mode\": \"%s\", "
+        "\"calls\": %zu, \"total_ns\": %lld, \"first_call_ns\": %lld}\n",
+        case_name,
+        conversion,
+        mode,
+        calls,
+        static_cast<long long>(total_ns),
+        static_cast<long long>(first_call_ns));
+}
+
+template <typename Conversion, typename Enum>
+void run_cold(const Case<Enum>& benchmark_case) {
+    Conversion conversion;
+
+    const auto start = Clock::now();
+    const auto result = conversion(benchmark_case.value(0));
+    const auto first_call_ns = elapsed_ns(start);
+
+    sink += result;
+    report(benchmark_case.name, Conversion::name, "cold", 1, first_call_ns, first_call_ns);
+}
+
+template <typename Conversion, typename Enum>
+::std::size_t convert_all(
+    Conversion& conversion, const ::std::vector<Enum>& values, ::std::size_t iterations) {
+    ::std::size_t result = 0;
+    ::std::size_t index = 0;
+    for (::std::size_t iteration = 0; iteration < iterations; ++iteration) {
+        result += conversion(values[index]);
+        if (++index == values.size()) {
+            index = 0;
+        }
+    }
+    return result;
+}
+
+template <typename Conversion, typename Enum>
+void run_hot(const Case<Enum>& benchmark_case, const Options& options) {
+    Conversion conversion;
+    const auto values = benchmark_case.shuffled_values();
+
+    // Static data is initialized and caches are warmed up
+    sink += convert_all(conversion, values, values.size());
+
+    const auto start = Clock::now();
+    sink += convert_all(conversion, values, options.iterations);
+    report(benchmark_case.name, Conversion::name, "hot", options.iterations, elapsed_ns(start), 0);
+}
+
+// All threads call conversion for the first time simultaneously, so
+// they contend on guard of its static data, and then convert in loop
+template <typename Conversion, typename Enum>
+void run_contended(const Case<Enum>& benchmark_case, const Options& options) {
+    const auto values = benchmark_case.shuffled_values();
+
+    ::std::atomic<unsigned> ready{0};
+    ::std::atomic<bool> started{false};
+    ::std::atomic<::std::int64_t> first_call_ns{0};
+
+    ::std::vector<::std::thread> threads;
+    for (unsigned thread = 0; thread < options.threads; ++thread) {
+        threads.emplace_back([&, thread] {
+            Conversion conversion;
+
+            ++ready;
+            while (!started.load(::std::memory_order_acquire)) {
+            }
+
+            const auto start = Clock::now();
+            auto result = conversion(values[thread % values.size()]);
+            const auto thread_first_call_ns = elapsed_ns(start);
+
+            auto current = first_call_ns.load();
+            while (current < thread_first_call_ns
+                   && !first_call_ns.compare_exchange_weak(current, thread_first_call_ns)) {
+            }
+
+            result += convert_all(conversion, values, options.iterations);
+            sink += result;
+        });
+    }
+
+    while (ready.load() != options.threads) {
+    }
+
+    const auto start = Clock::now();
+    started.store(true, ::std::memory_order_release);
+    for (auto& thread : threads) {
+        thread.join();
+    }
+
+    report(
+        benchmark_case.name,
+        Conversion::name,
+        "contended",
+        options.iterations * options.threads,
+        elapsed_ns(start),
+        first_call_ns.load());
+}
+
+template <typename Conversion, typename Enum>
+void run(const Case<Enum>& benchmark_case, const Options& options) {
+    if (options.mode == "cold") {
+        run_cold<Conversion>(benchmark_case);
+    } else if (options.mode == "hot") {
+        run_hot<Conversion>(benchmark_case, options);
+    } else {
+        run_contended<Conversion>(benchmark_case, options);
+    }
+}
+
+// Usage: <binary> cold|hot|contended <iterations> <threads>
+inline bool parse_options(int argc, char** argv, Options& options) {
+    if (argc != 4) {
+        return false;
+    }
+
+    options.mode = argv[1];
+    options.iterations = ::std::strtoull(argv[2], nullptr, 10);
+    options.threads = static_cast<unsigned>(::std::strtoul(argv[3], nullptr, 10));
+
+    return (options.mode == "cold" || options.mode == "hot" || options.mode == "contended")
+        && options.iterations > 0 && options.threads > 0;
+}
+
+}  // namespace runtime_benchmark
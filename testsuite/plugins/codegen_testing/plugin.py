@@ -1,11 +1,18 @@
 import os
+import sys
 import logging
 import subprocess
 import distutils.spawn
 import shutil
 import pathlib
+import tempfile
+import threading
+import dataclasses
+import typing as tp
+import concurrent.futures
 from xml.etree import ElementTree
 
+import yaml
 import pytest
 import jinja2
 
@@ -31,18 +38,361 @@ JINJA_MAIN_TEMPLATE = load_template("main.jinja2")
 
 GENERATED_DIR_NAME = ".generated"
 
+TESTSUITE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+LIBRARIES_DIR = os.path.join(TESTSUITE_DIR, "libraries")
+# googletest and nlohmann/json are built once and installed into
+# this prefix, test projects find them with `find_package`
+DEPENDENCIES_DIR = os.path.join(TESTSUITE_DIR, GENERATED_DIR_NAME, "dependencies")
+# Installation prefix of dependencies, built by tests
+DEPENDENCIES_PREFIX = os.path.join(DEPENDENCIES_DIR, "install")
+# Build directories of project variants are kept outside of projects, so
+# generator of one variant doesn't walk outputs of another
+PROJECTS_BUILD_DIR = os.path.join(TESTSUITE_DIR, GENERATED_DIR_NAME, "projects")
+
+# Library submodule -> its cmake arguments
+DEPENDENCIES = {
+    "googletest": ["-DINSTALL_GTEST=On", "-DBUILD_GMOCK=Off"],
+    "json": ["-DJSON_BuildTests=Off", "-DJSON_Install=On"],
+}
+
+PROJECT_FILE_PATTERNS = ("*.yaml", "*.yml")
+
+DEFAULT_VARIANT = "default"
+
+_PROJECT_BUILDER = None
+
+
+@dataclasses.dataclass()
+class VariantConfig:
+    # Generator is executed during build (`BUILD_TIME`)
+    build_time: bool = False
+    # Amount of unity sources with converters (`OUTPUT_SHARDS`)
+    output_shards: int = 0
+    # Files and their flags are taken from exported compile commands
+    # (`COMPILE_COMMANDS`), requires `build_time`
+    compile_commands: bool = False
+
+    def codegen_arguments(self, build_dir: str) -> tp.List[str]:
+        """
+        Arguments of `target_codegen`, that select this variant.
+        """
+        arguments = []
+        if self.build_time:
+            arguments.append("BUILD_TIME")
+        if self.output_shards:
+            arguments += ["OUTPUT_SHARDS", str(self.output_shards)]
+        if self.compile_commands:
+            arguments += ["COMPILE_COMMANDS", os.path.join(build_dir, "compile_commands.json")]
+        return arguments
+
+
+@dataclasses.dataclass()
+class ProjectConfig:
+    """
+    Content of `test_project.yaml`. Every variant is a separate build
+    of project with different `target_codegen` options, that runs all
+    tests of project.
+    """
+
+    variants: tp.Dict[str, VariantConfig]
+    # Names of tests get variant suffix, if variants are declared
+    declares_variants: bool = False
+    # Compile definitions of test target
+    compile_definitions: tp.List[str] = dataclasses.field(default_factory=list)
+
+    @classmethod
+    def load(cls, path: str) -> "ProjectConfig":
+        with open(path, "r") as f:
+            data = yaml.safe_load(f) or {}
+
+        variants = data.pop("variants", None)
+        compile_definitions = data.pop("compile_definitions", None) or []
+        if data:
+            raise RuntimeError(f"Unknown options {sorted(data)} of test project '{path}'")
+
+        if not variants:
+            return cls(
+                variants={DEFAULT_VARIANT: VariantConfig()},
+                compile_definitions=compile_definitions,
+            )
+
+        try:
+            return cls(
+                variants={
+                    name: VariantConfig(**(options or {})) for name, options in variants.items()
+                },
+                declares_variants=True,
+                compile_definitions=compile_definitions,
+            )
+        except TypeError as e:
+            raise RuntimeError(f"Invalid variant of test project '{path}': {e}")
+
+    def item_name(self, test_id: str, variant: str) -> str:
+        return f"{test_id}[{variant}]" if self.declares_variants else test_id
+
 
 def pytest_sessionstart(session):
     pass
 
 
+def pytest_collection(session):
+    # Test projects are collected one by one, so all of them are
+    # found and submitted for build before collection starts
+    global _PROJECT_BUILDER
+    builds = [
+        (project_file, variant)
+        for project_file in find_projects(session.config.args)
+        for variant in ProjectConfig.load(project_file).variants
+    ]
+    _PROJECT_BUILDER = ProjectBuilder(session.config, len(builds))
+
+    for project_file, variant in builds:
+        _PROJECT_BUILDER.build(project_file, variant)
+
+
+def pytest_sessionfinish(session):
+    if _PROJECT_BUILDER is not None:
+        _PROJECT_BUILDER.shutdown()
+
+
 def pytest_collect_file(parent, path):
-    if not path.fnmatch("*.yaml") and not path.fnmatch("*.yml"):
+    if not any(path.fnmatch(pattern) for pattern in PROJECT_FILE_PATTERNS):
         return
 
     return UnittestFile.from_parent(parent=parent, path=pathlib.Path(path))
 
 
+def find_projects(args: tp.List[str]) -> tp.List[str]:
+    """
+    Files of test projects, that will be collected for `args`.
+    """
+    result = set()
+    for arg in args:
+        path = os.path.abspath(arg.split("::")[0])
+
+        if os.path.isfile(path):
+            candidates = [path]
+        elif os.path.isdir(path):
+            candidates = []
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames[:] = [name for name in dirnames if not name.startswith(".")]
+                candidates += [os.path.join(dirpath, filename) for filename in filenames]
+        else:
+            continue
+
+        result.update(
+            candidate
+            for candidate in candidates
+            if any(
+                pathlib.PurePath(candidate).match(pattern) for pattern in PROJECT_FILE_PATTERNS
+            )
+        )
+
+    return sorted(result)
+
+
+def available_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def write_if_changed(path: str, content: str):
+    # Unchanged files keep modification time, so cmake
+    # doesn't reconfigure and rebuild projects
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            if f.read() == content:
+                return
+
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def run_command(args: tp.List[str], cwd: str, error: str) -> str:
+    process = subprocess.run(args, capture_output=True, cwd=cwd)
+
+    if process.returncode != 0:
+        logger.error("stderr:\n%s", process.stderr.decode("utf-8"))
+        logger.error("stdout:\n%s", process.stdout.decode("utf-8"))
+        raise RuntimeError(error)
+
+    return process.stdout.decode("utf-8")
+
+
+def cmake_generator_args(build_dir: str) -> tp.List[str]:
+    # Generator of configured build directory can't be changed
+    if os.path.exists(os.path.join(build_dir, "CMakeCache.txt")):
+        return []
+
+    if shutil.which("ninja") is not None:
+        return ["-G", "Ninja"]
+
+    return []
+
+
+class ProjectBuilder:
+    """
+    Builds test projects concurrently. Every project build uses
+    its share of available CPUs.
+    """
+
+    def __init__(self, config, builds_count: int):
+        self._cmake_bin = config.option.cmake_binary
+        if self._cmake_bin is None:
+            raise RuntimeError(
+                "No cmake executable has been found. Specify cmake binary in .ini as `cmake_binary`"
+            )
+
+        self._clang_library = config.option.libclang_path
+        self._dependencies_prefix = config.option.dependencies_prefix
+        self._clean = config.option.clean_test_projects
+
+        # Dependencies are built before any project, so they use all jobs
+        self._dependencies_jobs = config.option.build_jobs or available_cpus()
+        workers = max(1, min(builds_count, self._dependencies_jobs))
+        self._jobs = max(1, self._dependencies_jobs // workers)
+
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        self._lock = threading.Lock()
+        # Variants of project share its CMakeLists file and main source
+        self._project_files_lock = threading.Lock()
+        self._dependencies: tp.Optional[concurrent.futures.Future] = None
+        # Project file and variant -> future of test binary path
+        self._builds: tp.Dict[tp.Tuple[str, str], concurrent.futures.Future] = {}
+
+    def build(self, project_file: str, variant: str) -> concurrent.futures.Future:
+        key = (os.path.abspath(project_file), variant)
+
+        with self._lock:
+            if self._dependencies is None:
+                self._dependencies = self._executor.submit(self._build_dependencies)
+
+            if key not in self._builds:
+                self._builds[key] = self._executor.submit(self._build_project, *key)
+            return self._builds[key]
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+    def _build_dependencies(self) -> str:
+        if self._dependencies_prefix is not None:
+            return self._dependencies_prefix
+
+        prefix = DEPENDENCIES_PREFIX
+
+        # Dependencies are installed once, following builds only check,
+        # that nothing was changed.
+        for library, library_args in DEPENDENCIES.items():
+            logger.info("Building '%s' dependency", library)
+
+            build_dir = os.path.join(DEPENDENCIES_DIR, "build", library)
+            os.makedirs(build_dir, exist_ok=True)
+
+            if not os.path.exists(os.path.join(build_dir, "CMakeCache.txt")):
+                run_command(
+                    [
+                        self._cmake_bin,
+                        *cmake_generator_args(build_dir),
+                        "-DCMAKE_BUILD_TYPE=Release",
+                        f"-DCMAKE_INSTALL_PREFIX={prefix}",
+                        *library_args,
+                        os.path.join(LIBRARIES_DIR, library),
+                    ],
+                    cwd=build_dir,
+                    error=f"Unable to configure '{library}' dependency",
+                )
+
+            run_command(
+                [
+                    self._cmake_bin,
+                    "--build",
+                    ".",
+                    "--target",
+                    "install",
+                    "--parallel",
+                    str(self._dependencies_jobs),
+                ],
+                cwd=build_dir,
+                error=f"Unable to build '{library}' dependency",
+            )
+
+        return prefix
+
+    def _build_project(self, project_file: str, variant: str) -> str:
+        dependencies_prefix = self._dependencies.result()
+
+        project_path = os.path.dirname(project_file)
+        project_name = os.path.split(project_path)[-1]
+        project_config = ProjectConfig.load(project_file)
+        variant_config = project_config.variants[variant]
+        logger.info("Building '%s' project ('%s' variant)", project_name, variant)
+
+        project_generated_dir = os.path.join(project_path, GENERATED_DIR_NAME)
+        project_build_dir = os.path.join(PROJECTS_BUILD_DIR, project_name, variant)
+
+        # Build directory is kept between runs, so unchanged
+        # projects are not rebuilt
+        if self._clean and os.path.exists(project_build_dir):
+            shutil.rmtree(project_build_dir)
+
+        os.makedirs(project_build_dir, exist_ok=True)
+
+        template_args = {
+            "project_name": project_name,
+            "clang_library": self._clang_library,
+            "compile_definitions": project_config.compile_definitions,
+        }
+
+        with self._project_files_lock:
+            logger.info("Generating CMakeLists file for '%s' project", project_name)
+            os.makedirs(project_generated_dir, exist_ok=True)
+
+            write_if_changed(
+                os.path.join(project_path, "CMakeLists.txt"),
+                JINJA_CMAKE_LISTS_TEMPLATE.render(**template_args),
+            )
+
+            write_if_changed(
+                os.path.join(project_generated_dir, "main.cpp"),
+                JINJA_MAIN_TEMPLATE.render(**template_args),
+            )
+
+        logger.info(
+            "Running cmake configuration for project '%s' ('%s' variant)", project_name, variant
+        )
+
+        # Generator is executed during configuration,
+        # so project is configured by every run
+        run_command(
+            [
+                self._cmake_bin,
+                *cmake_generator_args(project_build_dir),
+                "-DCMAKE_BUILD_TYPE=Release",
+                "-DCMAKE_EXPORT_COMPILE_COMMANDS=On",
+                f"-DCMAKE_PREFIX_PATH={dependencies_prefix}",
+                # Generator runs with the same interpreter, as tests
+                f"-DPython3_EXECUTABLE={sys.executable}",
+                # Options of `target_codegen`, that select variant
+                "-DTEST_CODEGEN_ARGS="
+                + ";".join(variant_config.codegen_arguments(project_build_dir)),
+                project_path,
+            ],
+            cwd=project_build_dir,
+            error=f"Unable to configure test project '{project_name}' ('{variant}' variant)",
+        )
+
+        logger.info("Running project '%s' build ('%s' variant)", project_name, variant)
+        run_command(
+            [self._cmake_bin, "--build", ".", "--parallel", str(self._jobs)],
+            cwd=project_build_dir,
+            error=f"Unable to build test project '{project_name}' ('{variant}' variant)",
+        )
+
+        # todo: currently this will work only on linux. fix this for other OS
+        return os.path.join(project_build_dir, project_name)
+
+
 def pytest_addoption(parser):
     parser.addoption(
         "--cmake_binary",
@@ -60,109 +410,167 @@ def pytest_addoption(parser):
         help="Specifies path to libclang library",
     )
 
+    parser.addoption(
+        "--dependencies_prefix",
+        dest="dependencies_prefix",
+        type=str,
+        default=None,
+        help="Prefix with installed googletest and nlohmann/json. By default they are built from "
+        "submodules once and installed into shared prefix.",
+    )
+
+    parser.addoption(
+        "--build_jobs",
+        dest="build_jobs",
+        type=int,
+        default=0,
+        help="Amount of parallel compilation jobs, shared by concurrently built test projects. "
+        "`0` means amount of available CPUs.",
+    )
+
+    parser.addoption(
+        "--clean_test_projects",
+        dest="clean_test_projects",
+        action="store_true",
+        help="Remove build directories of test projects instead of rebuilding them incrementally.",
+    )
+
 
 class UnittestFile(pytest.File):
     def __init__(self, *args, **kwargs):
         pytest.File.__init__(self, *args, **kwargs)
 
     def collect(self):
-        # Build project & collect tests.
-        project_path = os.path.dirname(self.path)
+        # Build project variants & collect tests.
+        project_file = str(self.path)
+        project_name = os.path.split(os.path.dirname(project_file))[-1]
+        config = ProjectConfig.load(project_file)
+
+        for variant in config.variants:
+            # Project is usually submitted for build before collection
+            test_binary = _PROJECT_BUILDER.build(project_file, variant).result()
+
+            logger.info(
+                "Running test file of project '%s' ('%s' variant) to collect tests",
+                project_name,
+                variant,
+            )
 
-        project_name = os.path.split(project_path)[-1]
-        logger.info("Building '%s' project", project_name)
-        logger.info("Generating CMakeLists file for '%s' project", project_name)
+            process = subprocess.run(
+                [test_binary, "--gtest_list_tests"],
+                capture_output=True,
+            )
 
-        project_generated_dir = os.path.join(project_path, GENERATED_DIR_NAME)
+            if process.returncode != 0:
+                logger.error("stderr:\n%s", process.stderr.decode("utf-8"))
+                logger.error("stdout:\n%s", process.stdout.decode("utf-8"))
+                raise RuntimeError(
+                    f"Unable to collect test project '{project_name}' test cases"
+                )
 
-        if os.path.exists(project_generated_dir):
-            shutil.rmtree(project_generated_dir)
+            current_case = None
+            for line in process.stdout.decode("utf-8").split("\n"):
+                name = line.strip()
+                if not name:
+                    continue
+
+                if name[-1] == ".":
+                    current_case = name[:-1]
+                    continue
+
+                test_id = f"{current_case}.{name}"
+                yield UnittestItem.from_parent(
+                    parent=self,
+                    name=config.item_name(test_id, variant),
+                    path=self.path,
+                    binary=test_binary,
+                    test_id=test_id,
+                )
 
-        os.makedirs(project_generated_dir, exist_ok=True)
 
-        template_args = {
-            "project_name": project_name,
-            "clang_library": self.session.config.option.libclang_path,
-        }
+def parse_gtest_xml(xml_filename) -> tp.Dict[str, tp.Tuple[tp.List[str], bool]]:
+    """
+    Test id -> failures and skip flag.
+    """
+    root = ElementTree.parse(xml_filename)
+    result = {}
+    for test_suite in root.findall("testsuite"):
+        test_suite_name = test_suite.attrib["name"]
+        for test_case in test_suite.findall("testcase"):
+            test_name = test_case.attrib["name"]
+            failures = []
+            failure_elements = test_case.findall("failure")
+            for failure_elem in failure_elements:
+                failures.append(failure_elem.text)
+            skipped = (
+                test_case.attrib["status"] == "notrun"
+                or test_case.attrib.get("result", None) == "skipped"
+            )
+            result[f"{test_suite_name}.{test_name}"] = (failures, skipped)
 
-        with open(os.path.join(project_path, "CMakeLists.txt"), "w") as f:
-            f.write(JINJA_CMAKE_LISTS_TEMPLATE.render(**template_args))
+    return result
 
-        with open(os.path.join(project_generated_dir, "main.cpp"), "w") as f:
-            f.write(JINJA_MAIN_TEMPLATE.render(**template_args))
 
-        logger.info("Running cmake configuration for project '%s'", project_name)
+def split_gtest_output(output: str) -> tp.Dict[str, str]:
+    """
+    Test id -> lines, printed between `[ RUN ]` and result of test.
+    """
+    result = {}
+    current_test = None
+    for line in output.split("\n"):
+        line = line.strip()
+        if line.startswith("[ RUN      ]"):
+            current_test = line[len("[ RUN      ]") :].strip()
+            result[current_test] = []
 
-        cmake_bin = self.session.config.option.cmake_binary
-        if cmake_bin is None:
-            raise RuntimeError(
-                "No cmake executable has been found. Specify cmake binary in .ini as `cmake_binary`"
-            )
+        if current_test is not None:
+            result[current_test].append(line)
 
-        project_build_dir = os.path.join(project_generated_dir, "build")
-        os.makedirs(project_build_dir, exist_ok=True)
+        if line.startswith(("[       OK ]", "[  FAILED  ]", "[  SKIPPED ]")):
+            current_test = None
 
-        process = subprocess.run(
-            [
-                cmake_bin,
-                "-DCMAKE_BUILD_TYPE=Release",
-                "-DCMAKE_EXPORT_COMPILE_COMMANDS=On",
-                "../..",
-            ],
-            capture_output=True,
-            cwd=project_build_dir,
-        )
+    return {test_id: "\n".join(lines) for test_id, lines in result.items()}
 
-        if process.returncode != 0:
-            logger.error("stderr:\n%s", process.stderr.decode("utf-8"))
-            logger.error("stdout:\n%s", process.stdout.decode("utf-8"))
-            raise RuntimeError(f"Unable to configure test project '{project_name}'")
 
-        logger.info("Running project '%s' build", project_name)
-        process = subprocess.run(
-            [cmake_bin, "--build", ".", "--", "-j12"],
-            capture_output=True,
-            cwd=project_build_dir,
-        )
+class GoogleTestRun:
+    """
+    Result of single test binary execution.
+    """
 
-        if process.returncode != 0:
-            logger.error("stderr:\n%s", process.stderr.decode("utf-8"))
-            logger.error("stdout:\n%s", process.stdout.decode("utf-8"))
-            raise RuntimeError(f"Unable to build test project '{project_name}'")
+    def __init__(self, binary: str, test_ids: tp.List[str]):
+        self.binary = binary
+        self.test_ids = test_ids
 
-        logger.info("Running test file of project '%s' to collect tests", project_name)
+        # Unique report path, so concurrent runs don't overwrite each other
+        fd, xml_path = tempfile.mkstemp(prefix="gtest_", suffix=".xml")
+        os.close(fd)
 
-        # todo: currently this will work only on linux. fix this for other OS
-        test_binary = os.path.join(project_build_dir, project_name)
+        try:
+            process = subprocess.run(
+                [
+                    binary,
+                    f"--gtest_filter={':'.join(test_ids)}",
+                    f"--gtest_output=xml:{xml_path}",
+                ],
+                capture_output=True,
+            )
 
-        process = subprocess.run(
-            [test_binary, "--gtest_list_tests"],
-            capture_output=True,
-        )
+            # Report is not written if binary crashed
+            try:
+                self.results = parse_gtest_xml(xml_path)
+            except ElementTree.ParseError:
+                self.results = {}
+        finally:
+            os.remove(xml_path)
 
-        if process.returncode != 0:
-            logger.error("stderr:\n%s", process.stderr.decode("utf-8"))
-            logger.error("stdout:\n%s", process.stdout.decode("utf-8"))
-            raise RuntimeError(
-                f"Unable to collect test project '{project_name}' test cases"
-            )
+        self.return_code = process.returncode
+        self.output = "\n".join((line.strip() for line in process.stdout.decode("utf-8").split("\n")))
+        self.test_outputs = split_gtest_output(self.output)
 
-        current_case = None
-        for line in process.stdout.decode("utf-8").split("\n"):
-            name = line.strip()
-            if not name:
-                continue
-
-            if name[-1] == ".":
-                current_case = name[:-1]
-                continue
-
-            yield UnittestItem.from_parent(
-                parent=self,
-                name=f"{current_case}.{name}",
-                path=self.path,
-                binary=test_binary,
-            )
+    @property
+    def crashed(self) -> bool:
+        # gtest exits with `1` if some tests failed
+        return self.return_code not in (0, 1)
 
 
 class UnittestItem(pytest.Item):
@@ -172,10 +580,13 @@ class UnittestItem(pytest.Item):
         binary: str,
         parent,
         path: str,
+        test_id: str,
     ):
         pytest.Item.__init__(self, name, parent)
         self._path = path
         self._binary = binary
+        # Name of test in binary
+        self._test_id = test_id
 
     def runtest(self):
         failures, output = self._execute_test()
@@ -184,28 +595,43 @@ class UnittestItem(pytest.Item):
         if failures:
             raise CppFailureError(failures)
 
-    def _execute_test(self):
-        output = ""
-
-        # todo: this will only work for linux. Use tmp lib for this.
-        xml_path = "/tmp/gtest_output.xml"
-        args = [
-            f"--gtest_filter={self.name}",
-            f"--gtest_output=xml:{xml_path}",
-        ]
-
-        process = subprocess.run(
-            [self._binary, *args],
-            capture_output=True,
-        )
+    def _selected_test_ids(self) -> tp.List[str]:
+        # Only tests, selected for this session (or xdist worker), are run
+        return [
+            item._test_id
+            for item in self.session.items
+            if isinstance(item, UnittestItem)
+            and item.parent is self.parent
+            and item._binary == self._binary
+        ] or [self._test_id]
+
+    def _binary_run(self) -> GoogleTestRun:
+        # Binary of every project variant is executed once for all
+        # its selected tests, every item gets its result from this run
+        if not hasattr(self.parent, "_gtest_runs"):
+            self.parent._gtest_runs = {}
+
+        run = self.parent._gtest_runs.get(self._binary)
+        if run is None:
+            run = GoogleTestRun(self._binary, self._selected_test_ids())
+            self.parent._gtest_runs[self._binary] = run
+
+        # Tests, that were not finished because of crash, are run separately
+        if (
+            self._test_id not in run.results
+            and run.crashed
+            and run.test_ids != [self._test_id]
+        ):
+            run = GoogleTestRun(self._binary, [self._test_id])
+
+        return run
 
-        stdout_ = process.stdout.decode("utf-8")
-        return_code = process.returncode
+    def _execute_test(self):
+        run = self._binary_run()
+        output = run.test_outputs.get(self._test_id, "")
 
-        if return_code != 0:
-            # Error here
-            output = "\n".join((line.strip() for line in stdout_.split("\n")))
-            if return_code != 1:
+        if self._test_id not in run.results:
+            if run.crashed:
                 msg = (
                     "Internal Error: calling {executable} "
                     "for test {test_id} failed (returncode={returncode}):\n"
@@ -214,48 +640,25 @@ class UnittestItem(pytest.Item):
                 failure = GoogleTestFailure(
                     msg.format(
                         executable=self._binary,
-                        test_id=self.name,
-                        output=output,
-                        returncode=return_code,
+                        test_id=self._test_id,
+                        output=run.output,
+                        returncode=run.return_code,
                     )
                 )
+                return [failure], run.output
 
-                return [failure], output
-
-        results = self._parse_xml(xml_path)
-
-        for (executed_test_id, failures, skipped) in results:
-            if executed_test_id == self.name:
-                if failures:
-                    return [GoogleTestFailure(x) for x in failures], output
-                if skipped:
-                    pytest.skip()
-                else:
-                    return None, output
-
-        msg = "Internal Error: could not find test " "{test_id} in results:\n{results}"
-        results_list = "\n".join(x for (x, f) in results)
-        failure = GoogleTestFailure(msg.format(test_id=self.name, results=results_list))
-        return [failure], output
-
-    def _parse_xml(self, xml_filename):
-        root = ElementTree.parse(xml_filename)
-        result = []
-        for test_suite in root.findall("testsuite"):
-            test_suite_name = test_suite.attrib["name"]
-            for test_case in test_suite.findall("testcase"):
-                test_name = test_case.attrib["name"]
-                failures = []
-                failure_elements = test_case.findall("failure")
-                for failure_elem in failure_elements:
-                    failures.append(failure_elem.text)
-                skipped = (
-                    test_case.attrib["status"] == "notrun"
-                    or test_case.attrib.get("result", None) == "skipped"
-                )
-                result.append((f"{test_suite_name}.{test_name}", failures, skipped))
+            msg = "Internal Error: could not find test " "{test_id} in results:\n{results}"
+            results_list = "\n".join(run.results)
+            failure = GoogleTestFailure(msg.format(test_id=self._test_id, results=results_list))
+            return [failure], output
+
+        failures, skipped = run.results[self._test_id]
+        if failures:
+            return [GoogleTestFailure(x) for x in failures], output
+        if skipped:
+            pytest.skip()
 
-        return result
+        return None, output
 
     def repr_failure(self, excinfo):
         if isinstance(excinfo.value, CppFailureError):
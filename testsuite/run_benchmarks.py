@@ -0,0 +1,143 @@
+import os
+import sys
+import logging
+import argparse
+import tempfile
+import dataclasses
+import typing as tp
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import main as codegen  # noqa: E402
+from pipeline.profiling import Profiler  # noqa: E402
+from benchmarks import results  # noqa: E402
+from benchmarks.corpus import CorpusConfig, generate_corpus  # noqa: E402
+
+# Phases, shorter than this (in seconds), are not compared with baseline
+# because their measurement is mostly noise.
+MIN_COMPARED_TIME = 0.05
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmarks code generation on synthetic project"
+    )
+
+    corpus_defaults = CorpusConfig()
+    for field in dataclasses.fields(CorpusConfig):
+        parser.add_argument(
+            f"--{field.name}",
+            type=field.type,
+            default=getattr(corpus_defaults, field.name),
+            help=f"Corpus parameter (default: {getattr(corpus_defaults, field.name)})",
+        )
+
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Amount of parsing processes, passed to generator",
+    )
+
+    parser.add_argument(
+        "--clang_library",
+        type=str,
+        default=None,
+        help="Path to libclang library",
+    )
+
+    results.add_arguments(parser, metric="phase")
+
+    return parser.parse_args()
+
+
+def run_generator(args, project_dir: str, output_dir: str) -> Profiler:
+    os.makedirs(os.path.join(output_dir, "include"), exist_ok=True)
+    os.makedirs(os.path.join(output_dir, "src"), exist_ok=True)
+
+    codegen_args = codegen.parse_args(
+        [
+            f"--project_dir={project_dir}",
+            f"--project_include_dir={os.path.join(project_dir, 'include')}",
+            f"--output_include_dir={os.path.join(output_dir, 'include')}",
+            f"--output_source_dir={os.path.join(output_dir, 'src')}",
+            "--namespace=corpus",
+            f"--clang_arg=-I{os.path.join(project_dir, 'include')}",
+            f"--jobs={args.jobs}",
+        ]
+        + ([f"--clang_library={args.clang_library}"] if args.clang_library else [])
+    )
+
+    profiler = Profiler()
+    with profiler.phase("total"):
+        codegen.main(codegen_args, profiler)
+
+    return profiler
+
+
+def merge_fastest(scenario: dict, profiler: Profiler):
+    for name, phase in profiler.phases.items():
+        results.merge_fastest(
+            scenario.setdefault(name, {}), {"wall": phase.wall, "cpu": phase.cpu}
+        )
+
+
+def run_scenarios(args, work_dir: str) -> dict:
+    project_dir = os.path.join(work_dir, "project")
+    corpus_config = CorpusConfig(
+        **{field.name: getattr(args, field.name) for field in dataclasses.fields(CorpusConfig)}
+    )
+    generate_corpus(corpus_config, project_dir)
+
+    cold = {}
+    incremental = {}
+    for run in range(args.repeat):
+        output_dir = os.path.join(work_dir, f"output_{run}")
+
+        # Everything is parsed and generated
+        merge_fastest(cold, run_generator(args, project_dir, output_dir))
+        # Nothing is changed, everything is skipped
+        merge_fastest(incremental, run_generator(args, project_dir, output_dir))
+
+    return {
+        "corpus": dataclasses.asdict(corpus_config),
+        "jobs": args.jobs,
+        "scenarios": {
+            "cold": cold,
+            "incremental": incremental,
+        },
+    }
+
+
+def scenario_phases(benchmark_results: dict) -> tp.Dict[str, results.Metrics]:
+    return {
+        f"{scenario}/{name}": phase
+        for scenario, phases in benchmark_results["scenarios"].items()
+        for name, phase in phases.items()
+    }
+
+
+def main():
+    args = parse_args()
+
+    # Per file logs of generator are not interesting here
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        benchmark_results = run_scenarios(args, work_dir)
+
+    return results.report(
+        args,
+        benchmark_results,
+        parameters=("corpus", "jobs"),
+        entries_of=scenario_phases,
+        printed_metrics=("wall", "cpu"),
+        compared_metrics=("wall",),
+        unit="s",
+        min_compared_value=MIN_COMPARED_TIME,
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+import os
+import sys
+import json
+import logging
+import argparse
+import tempfile
+import typing as tp
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import main as codegen  # noqa: E402
+from benchmarks import results  # noqa: E402
+from benchmarks.runtime import (  # noqa: E402
+    BACKEND_LOOKUPS,
+    NAMESPACE,
+    RuntimeCase,
+    backend_cases,
+    generate_project,
+)
+from plugins.codegen_testing.plugin import (  # noqa: E402
+    DEPENDENCIES_PREFIX,
+    cmake_generator_args,
+    run_command,
+)
+
+MODES = ("cold", "hot", "contended")
+
+PRINTED_METRICS = (
+    "cold_first_call_ns",
+    "hot_ns_per_call",
+    "contended_first_call_ns",
+    "contended_ns_per_call",
+)
+
+# Metrics, that are compared with baseline (lower is better)
+COMPARED_METRICS = ("hot_ns_per_call", "contended_ns_per_call")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmarks generated conversions on enums of different size"
+    )
+
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[4, 64, 1024, 10000],
+        help="Amounts of enum values",
+    )
+
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=sorted(BACKEND_LOOKUPS),
+        default=sorted(BACKEND_LOOKUPS),
+        help="Values of `--conversion_backend`, every backend is built as separate project",
+    )
+
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=1000000,
+        help="Amount of conversion calls in loop (per thread)",
+    )
+
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=max(min(os.cpu_count() or 1, 8), 2),
+        help="Amount of threads in contended scenario",
+    )
+
+    parser.add_argument(
+        "--dependencies_prefix",
+        type=str,
+        default=DEPENDENCIES_PREFIX,
+        help="Installation prefix of nlohmann/json (default: prefix, populated by run_tests.py)",
+    )
+
+    parser.add_argument(
+        "--clang_library",
+        type=str,
+        default=None,
+        help="Path to libclang library",
+    )
+
+    parser.add_argument(
+        "--work_dir",
+        type=str,
+        default=None,
+        help="Directory of benchmark projects and builds (default: temporary directory)",
+    )
+
+    results.add_arguments(parser, metric="conversion")
+
+    return parser.parse_args()
+
+
+def run_generator(args, backend: str, project_dir: str, generated_dir: str):
+    os.makedirs(os.path.join(generated_dir, "include"), exist_ok=True)
+    os.makedirs(os.path.join(generated_dir, "src"), exist_ok=True)
+
+    codegen_args = codegen.parse_args(
+        [
+            f"--project_dir={project_dir}",
+            f"--project_include_dir={os.path.join(project_dir, 'include')}",
+            f"--output_include_dir={os.path.join(generated_dir, 'include')}",
+            f"--output_source_dir={os.path.join(generated_dir, 'src')}",
+            f"--namespace={NAMESPACE}",
+            f"--clang_arg=-I{os.path.join(project_dir, 'include')}",
+            f"--conversion_backend={backend}",
+        ]
+        + ([f"--clang_library={args.clang_library}"] if args.clang_library else [])
+    )
+    codegen.main(codegen_args)
+
+
+def build_project(args, cases: tp.List[RuntimeCase], backend: str, work_dir: str) -> str:
+    """
+    Generates converters of benchmark project, builds it
+    in release mode and returns path of its binary.
+    """
+    project_dir = os.path.join(work_dir, backend, "project")
+    generated_dir = os.path.join(work_dir, backend, "generated")
+    build_dir = os.path.join(work_dir, backend, "build")
+    os.makedirs(build_dir, exist_ok=True)
+
+    generate_project(cases, project_dir, generated_dir)
+    run_generator(args, backend, project_dir, generated_dir)
+
+    run_command(
+        [
+            "cmake",
+            project_dir,
+            "-DCMAKE_BUILD_TYPE=Release",
+            f"-DCMAKE_PREFIX_PATH={os.path.abspath(args.dependencies_prefix)}",
+        ]
+        + cmake_generator_args(build_dir),
+        cwd=build_dir,
+        error=f"Unable to configure '{backend}' benchmark project",
+    )
+    run_command(
+        ["cmake", "--build", ".", "--parallel", str(os.cpu_count() or 1)],
+        cwd=build_dir,
+        error=f"Unable to build '{backend}' benchmark project",
+    )
+
+    return os.path.join(build_dir, "runtime_benchmark")
+
+
+def run_binary(args, binary: str, mode: str) -> tp.List[dict]:
+    output = run_command(
+        [binary, mode, str(args.iterations), str(args.threads)],
+        cwd=os.path.dirname(binary),
+        error=f"Benchmark '{mode}' run of '{binary}' failed",
+    )
+    return [json.loads(line) for line in output.splitlines() if line.strip()]
+
+
+def merge_fastest(conversions: dict, records: tp.List[dict]):
+    for record in records:
+        name = f"{record['conversion']}/{record['case']}"
+        mode = record["mode"]
+
+        metrics = {}
+        if mode != "hot":
+            # Hot loop is measured after static data is initialized
+            metrics[f"{mode}_first_call_ns"] = record["first_call_ns"]
+        if mode != "cold":
+            ns_per_call = record["total_ns"] / record["calls"]
+            metrics[f"{mode}_ns_per_call"] = ns_per_call
+            metrics[f"{mode}_calls_per_second"] = 1e9 / max(ns_per_call, 1e-9)
+
+        results.merge_fastest(conversions.setdefault(name, {}), metrics)
+
+
+def run_scenarios(args, work_dir: str) -> dict:
+    conversions = {}
+    for backend in args.backends:
+        cases = backend_cases(backend, args.sizes)
+        binary = build_project(args, cases, backend, work_dir)
+
+        for _ in range(args.repeat):
+            for mode in MODES:
+                merge_fastest(conversions, run_binary(args, binary, mode))
+
+    return {
+        "sizes": args.sizes,
+        "iterations": args.iterations,
+        "threads": args.threads,
+        "conversions": conversions,
+    }
+
+
+def main():
+    args = parse_args()
+
+    # Per file logs of generator and test plugin are not interesting here,
+    # plugin configures logging on import already
+    logging.getLogger().setLevel(logging.WARNING)
+
+    if args.work_dir is not None:
+        benchmark_results = run_scenarios(args, os.path.abspath(args.work_dir))
+    else:
+        with tempfile.TemporaryDirectory() as work_dir:
+            benchmark_results = run_scenarios(args, work_dir)
+
+    return results.report(
+        args,
+        benchmark_results,
+        parameters=("sizes", "iterations", "threads"),
+        entries_of=lambda benchmark_results: benchmark_results["conversions"],
+        printed_metrics=PRINTED_METRICS,
+        compared_metrics=COMPARED_METRICS,
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1 +1,7 @@
+import os
+import sys
+
+# Generator modules are imported by unit tests
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
 pytest_plugins = ("plugins.codegen_testing.plugin",)
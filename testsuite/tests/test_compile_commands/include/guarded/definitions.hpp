@@ -0,0 +1,15 @@
+#pragma once
+
+#ifdef CPP_CODEGEN_TEST_GUARD
+namespace guarded {
+/**
+ * @brief This enumeration is declared only with definition from compile commands.
+ * @cpp_codegen
+ * string_serialization
+ */
+enum class enum_guarded {
+    enum_guarded_val_1,
+    enum_guarded_val_2,
+};
+}
+#endif
@@ -0,0 +1,14 @@
+#include <gtest/gtest.h>
+
+#include <converters/enum_guarded.hpp>
+
+TEST(compile_commands, definitions_are_passed_to_generator) {
+    ASSERT_EQ(to_string(guarded::enum_guarded::enum_guarded_val_1), "enum_guarded_val_1");
+    ASSERT_EQ(to_string(guarded::enum_guarded::enum_guarded_val_2), "enum_guarded_val_2");
+}
+
+TEST(compile_commands, sources_without_commands_are_skipped) {
+#if __has_include(<converters/enum_unlisted.hpp>)
+    FAIL() << "Converters of enum from source without compile command are generated";
+#endif
+}
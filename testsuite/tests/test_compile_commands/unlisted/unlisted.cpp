@@ -0,0 +1,13 @@
+// Source is not compiled by test target, so it's not
+// in compile commands and generator skips it.
+
+namespace unlisted {
+/**
+ * @brief This enumeration should be ignored for codegen.
+ * @cpp_codegen
+ * string_serialization
+ */
+enum class enum_unlisted {
+    enum_unlisted_val_1,
+};
+}
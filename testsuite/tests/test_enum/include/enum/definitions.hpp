@@ -55,6 +55,8 @@ enum class enum_custom_json {
  * @cpp_codegen
  * string_serialization
  * json_serialization
+ * string_deserialization
+ * json_deserialization
  */
 enum class enum_custom_combined {
     enum_custom_combined_val_1,  //< "val_1_comb_string"s "val_1_comb_json"json
@@ -62,6 +64,49 @@ enum class enum_custom_combined {
                                  //< "val_2_comb_json"json
 };
 
+/**
+ * @brief This enumeration shows conversion of enum with
+ * non contiguous and duplicated values.
+ * @cpp_codegen
+ * string_serialization
+ * json_serialization
+ * string_deserialization
+ * json_deserialization
+ */
+enum class enum_sparse_values {
+    enum_sparse_values_negative = -5,   //< "negative"s "negative_json"json
+    enum_sparse_values_hundred = 100,   //< "hundred"s "hundred_json"json
+    enum_sparse_values_alias = 100,     //< "alias"s "alias_json"json
+    enum_sparse_values_big = 1 << 20,   //< "big"s "big_json"json
+};
+
+/**
+ * @brief This enumeration shows conversion of enum with
+ * contiguous values, that don't start from zero.
+ * @cpp_codegen
+ * string_serialization
+ * json_serialization
+ */
+enum class enum_contiguous_values : unsigned char {
+    enum_contiguous_values_val_3 = 3,
+    enum_contiguous_values_val_4,
+    enum_contiguous_values_val_5,
+};
+
+/**
+ * @brief This enumeration shows conversion from string of enum
+ * with many values.
+ * @cpp_codegen
+ * string_deserialization
+ */
+enum class enum_many_values {
+    alpha, bravo, charlie, delta, echo, foxtrot, golf, hotel, india,
+    juliett, kilo, lima, mike, november, oscar, papa, quebec, romeo,
+    sierra, tango, uniform, victor, whiskey, xray, yankee, zulu,
+    a, b, ab, ba, abc, cba,  //
+    empty,                   //< ""s
+};
+
 namespace internal {
 /**
  * @brief This enumeration shows namespaces support.
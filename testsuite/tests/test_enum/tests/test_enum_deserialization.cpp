@@ -0,0 +1,83 @@
+#include <gtest/gtest.h>
+#include <nlohmann/json.hpp>
+
+#include <stdexcept>
+
+#include <converters/enum_custom_combined.hpp>
+#include <converters/enum_many_values.hpp>
+#include <converters/enum_sparse_values.hpp>
+
+TEST(enum_custom_combined, from_string) {
+    some::cool::enum_custom_combined value;
+
+    from_string("val_1_comb_string", value);
+    ASSERT_EQ(value,
+              some::cool::enum_custom_combined::enum_custom_combined_val_1);
+
+    from_string("val_2_comb_string", value);
+    ASSERT_EQ(value,
+              some::cool::enum_custom_combined::enum_custom_combined_val_2);
+
+    ASSERT_THROW(from_string("val_1_comb_json", value), std::invalid_argument);
+    ASSERT_THROW(from_string("", value), std::invalid_argument);
+}
+
+TEST(enum_custom_combined, from_json) {
+    ASSERT_EQ(nlohmann::json("val_1_comb_json")
+                  .get<some::cool::enum_custom_combined>(),
+              some::cool::enum_custom_combined::enum_custom_combined_val_1);
+    ASSERT_EQ(nlohmann::json("val_2_comb_json")
+                  .get<some::cool::enum_custom_combined>(),
+              some::cool::enum_custom_combined::enum_custom_combined_val_2);
+
+    ASSERT_THROW(nlohmann::json("val_1_comb_string")
+                     .get<some::cool::enum_custom_combined>(),
+                 std::invalid_argument);
+    ASSERT_THROW(nlohmann::json(1).get<some::cool::enum_custom_combined>(),
+                 std::invalid_argument);
+}
+
+TEST(enum_sparse_values, from_string) {
+    some::cool::enum_sparse_values value;
+
+    from_string("negative", value);
+    ASSERT_EQ(value,
+              some::cool::enum_sparse_values::enum_sparse_values_negative);
+
+    from_string("alias", value);
+    ASSERT_EQ(value, some::cool::enum_sparse_values::enum_sparse_values_alias);
+
+    from_string("big", value);
+    ASSERT_EQ(value, some::cool::enum_sparse_values::enum_sparse_values_big);
+}
+
+TEST(enum_sparse_values, from_json) {
+    ASSERT_EQ(
+        nlohmann::json("hundred_json").get<some::cool::enum_sparse_values>(),
+        some::cool::enum_sparse_values::enum_sparse_values_hundred);
+}
+
+TEST(enum_many_values, from_string) {
+    const std::pair<const char*, some::cool::enum_many_values> expected[] = {
+        {"alpha", some::cool::enum_many_values::alpha},
+        {"mike", some::cool::enum_many_values::mike},
+        {"zulu", some::cool::enum_many_values::zulu},
+        {"a", some::cool::enum_many_values::a},
+        {"ab", some::cool::enum_many_values::ab},
+        {"ba", some::cool::enum_many_values::ba},
+        {"abc", some::cool::enum_many_values::abc},
+        {"cba", some::cool::enum_many_values::cba},
+        {"", some::cool::enum_many_values::empty},
+    };
+
+    for (const auto& [str, expected_value] : expected) {
+        some::cool::enum_many_values value;
+        from_string(str, value);
+        ASSERT_EQ(value, expected_value) << str;
+    }
+
+    some::cool::enum_many_values value;
+    ASSERT_THROW(from_string("alph", value), std::invalid_argument);
+    ASSERT_THROW(from_string("alphaa", value), std::invalid_argument);
+    ASSERT_THROW(from_string("bac", value), std::invalid_argument);
+}
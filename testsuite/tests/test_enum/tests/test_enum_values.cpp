@@ -0,0 +1,57 @@
+#include <gtest/gtest.h>
+#include <nlohmann/json.hpp>
+
+#include <stdexcept>
+
+#include <converters/enum_contiguous_values.hpp>
+#include <converters/enum_sparse_values.hpp>
+
+TEST(enum_sparse_values, to_string) {
+    ASSERT_EQ(
+        to_string(some::cool::enum_sparse_values::enum_sparse_values_negative),
+        "negative");
+    ASSERT_EQ(
+        to_string(some::cool::enum_sparse_values::enum_sparse_values_hundred),
+        "hundred");
+    ASSERT_EQ(
+        to_string(some::cool::enum_sparse_values::enum_sparse_values_alias),
+        "hundred");
+    ASSERT_EQ(to_string(some::cool::enum_sparse_values::enum_sparse_values_big),
+              "big");
+    ASSERT_THROW(to_string(static_cast<some::cool::enum_sparse_values>(1)),
+                 std::invalid_argument);
+}
+
+TEST(enum_sparse_values, to_json) {
+    ASSERT_EQ(nlohmann::json(
+                  some::cool::enum_sparse_values::enum_sparse_values_negative),
+              "negative_json");
+    ASSERT_EQ(nlohmann::json(
+                  some::cool::enum_sparse_values::enum_sparse_values_alias),
+              "hundred_json");
+    ASSERT_THROW(
+        nlohmann::json(static_cast<some::cool::enum_sparse_values>(1)),
+        std::invalid_argument);
+}
+
+TEST(enum_contiguous_values, to_string) {
+    ASSERT_EQ(to_string(some::cool::enum_contiguous_values::
+                            enum_contiguous_values_val_3),
+              "enum_contiguous_values_val_3");
+    ASSERT_EQ(to_string(some::cool::enum_contiguous_values::
+                            enum_contiguous_values_val_5),
+              "enum_contiguous_values_val_5");
+    ASSERT_THROW(to_string(static_cast<some::cool::enum_contiguous_values>(2)),
+                 std::invalid_argument);
+    ASSERT_THROW(to_string(static_cast<some::cool::enum_contiguous_values>(6)),
+                 std::invalid_argument);
+}
+
+TEST(enum_contiguous_values, to_json) {
+    ASSERT_EQ(nlohmann::json(some::cool::enum_contiguous_values::
+                                 enum_contiguous_values_val_4),
+              "enum_contiguous_values_val_4");
+    ASSERT_THROW(
+        nlohmann::json(static_cast<some::cool::enum_contiguous_values>(255)),
+        std::invalid_argument);
+}
@@ -0,0 +1,20 @@
+import pytest
+
+from generators.enum.annotations import AnnotationError, parse_conversion_values
+
+
+def test_values_with_postfixes():
+    assert parse_conversion_values('// "first"_json "se\\"cond"_str', "file.hpp") == {
+        "_json": "first",
+        "_str": 'se"cond',
+    }
+
+
+def test_value_without_postfix_at_end_of_comment_is_ignored():
+    assert parse_conversion_values('// "first"_json "second"', "file.hpp") == {"_json": "first"}
+    assert parse_conversion_values('/**\n * "value"\n */', "file.hpp") == {}
+
+
+def test_value_without_postfix_before_other_values():
+    with pytest.raises(AnnotationError, match="file.hpp:3:15: Postfix can not be empty"):
+        parse_conversion_values('// "first" "second"_json', "file.hpp", location=(3, 5))
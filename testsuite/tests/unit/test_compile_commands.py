@@ -0,0 +1,66 @@
+from pipeline.compile_commands import filter_arguments
+
+DIRECTORY = "/project/build"
+FILE_PATH = "/project/src/main.cpp"
+
+
+def test_compiler_input_and_output_are_dropped():
+    assert filter_arguments(
+        ["g++", "-c", "../src/main.cpp", "-o", "main.cpp.o", "-DNAME"], DIRECTORY, FILE_PATH
+    ) == ["-DNAME"]
+
+
+def test_warnings_and_debug_info_are_dropped():
+    arguments = [
+        "g++",
+        "-W",
+        "-Wall",
+        "-Wno-unused-parameter",
+        "-Werror=format-security",
+        "-Wl,--as-needed",
+        "-g",
+        "-g3",
+        "-ggdb",
+        "-gdwarf-4",
+        "-gsplit-dwarf",
+        "-O2",
+        "-DNAME",
+    ]
+    assert filter_arguments(arguments, DIRECTORY, FILE_PATH) == ["-DNAME"]
+
+
+def test_preprocessor_options_are_kept():
+    arguments = ["g++", "-Wp,-DNAME=1", "-Wp,-Iinclude", "-Xclang", "-fno-validate-pch"]
+    assert filter_arguments(arguments, DIRECTORY, FILE_PATH) == arguments[1:]
+
+
+def test_toolchain_is_kept_with_value():
+    assert filter_arguments(
+        ["clang++", "-gcc-toolchain", "/opt/gcc", "--gcc-toolchain=../gcc", "-DNAME"],
+        DIRECTORY,
+        FILE_PATH,
+    ) == ["-gcc-toolchain", "/opt/gcc", "--gcc-toolchain=/project/gcc", "-DNAME"]
+
+
+def test_dependency_file_options_are_dropped_with_values():
+    arguments = [
+        "g++",
+        "-MD",
+        "-MT",
+        "main.cpp.o",
+        "-MF",
+        "main.cpp.o.d",
+        "-MQ",
+        "main.cpp.o",
+        "-MFjoined.d",
+        "-DNAME",
+    ]
+    assert filter_arguments(arguments, DIRECTORY, FILE_PATH) == ["-DNAME"]
+
+
+def test_relative_paths_are_made_absolute():
+    assert filter_arguments(
+        ["g++", "-I", "../include", "-isystem../third_party", "-I/usr/include"],
+        DIRECTORY,
+        FILE_PATH,
+    ) == ["-I", "/project/include", "-isystem/project/third_party", "-I/usr/include"]
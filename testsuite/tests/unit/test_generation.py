@@ -0,0 +1,112 @@
+import os
+
+import main as codegen
+from pipeline.generation import Session, generate
+from pipeline.profiling import Profiler
+
+HEADER = """#pragma once
+
+namespace project {
+/**
+ * @cpp_codegen
+ * string_serialization
+ */
+enum class enum_rerun {
+    enum_rerun_val_1,
+};
+}
+"""
+
+
+def make_project(root) -> str:
+    project_dir = os.path.join(root, "project")
+    os.makedirs(os.path.join(project_dir, "include", "enum"))
+    with open(os.path.join(project_dir, "include", "enum", "definitions.hpp"), "w") as f:
+        f.write(HEADER)
+    return project_dir
+
+
+def generator_args(project_dir: str, include_dir: str, output_include_dir: str, source_dir: str):
+    for directory in (output_include_dir, source_dir):
+        os.makedirs(directory, exist_ok=True)
+
+    return codegen.parse_args(
+        [
+            f"--project_dir={project_dir}",
+            f"--project_include_dir={include_dir}",
+            f"--output_include_dir={output_include_dir}",
+            f"--output_source_dir={source_dir}",
+            "--namespace=project",
+        ]
+    )
+
+
+def run_generator(project_dir: str, include_dir: str, output_include_dir: str, source_dir: str):
+    codegen.main(generator_args(project_dir, include_dir, output_include_dir, source_dir))
+
+
+def read_header(include_dir: str) -> str:
+    with open(os.path.join(include_dir, "converters", "enum_rerun", "string_serialization.hpp")) as f:
+        return f.read()
+
+
+def test_rerun_with_other_output_include_dir(tmp_path):
+    project_dir = make_project(tmp_path)
+    include_dir = os.path.join(project_dir, "include")
+    source_dir = os.path.join(tmp_path, "src")
+
+    run_generator(project_dir, include_dir, os.path.join(tmp_path, "include_1"), source_dir)
+    run_generator(project_dir, include_dir, os.path.join(tmp_path, "include_2"), source_dir)
+
+    assert os.path.exists(os.path.join(tmp_path, "include_2", "converters", "enum_rerun.hpp"))
+    # Outputs of previous run are removed with their directories
+    assert os.listdir(os.path.join(tmp_path, "include_1")) == []
+
+
+def test_rerun_with_other_project_include_dir(tmp_path):
+    project_dir = make_project(tmp_path)
+    output_include_dir = os.path.join(tmp_path, "include")
+    source_dir = os.path.join(tmp_path, "src")
+
+    run_generator(project_dir, project_dir, output_include_dir, source_dir)
+    assert "#include <include/enum/definitions.hpp>" in read_header(output_include_dir)
+
+    run_generator(project_dir, os.path.join(project_dir, "include"), output_include_dir, source_dir)
+    assert "#include <enum/definitions.hpp>" in read_header(output_include_dir)
+
+
+def test_regeneration_of_changed_files(tmp_path):
+    project_dir = make_project(tmp_path)
+    output_include_dir = os.path.join(tmp_path, "include")
+    source_dir = os.path.join(tmp_path, "src")
+    args = generator_args(
+        project_dir, os.path.join(project_dir, "include"), output_include_dir, source_dir
+    )
+
+    header = os.path.join(project_dir, "include", "enum", "definitions.hpp")
+    other_header = os.path.join(project_dir, "include", "enum", "other.hpp")
+    with open(other_header, "w") as f:
+        f.write(HEADER.replace("enum_rerun", "enum_other"))
+
+    session = Session(translation_units_capacity=16)
+    generate(args, session=session)
+
+    with open(header, "w") as f:
+        f.write(HEADER.replace("enum_rerun_val_1,", "enum_rerun_val_1,\n    enum_rerun_val_2,"))
+    created_header = os.path.join(project_dir, "include", "enum", "created.hpp")
+    with open(created_header, "w") as f:
+        f.write(HEADER.replace("enum_rerun", "enum_created"))
+
+    profiler = Profiler()
+    generate(args, profiler, session, changed_files={header, created_header})
+
+    # Unchanged file is not parsed
+    parsed_files = {event.args["file"] for event in profiler.events if event.name == "parse"}
+    assert parsed_files == {header, created_header}
+    # Renders and writes are measured only with `--profile`
+    assert "render" not in profiler.phases and "write" not in profiler.phases
+
+    with open(os.path.join(source_dir, "converters", "enum_rerun.cpp")) as f:
+        assert "enum_rerun_val_2" in f.read()
+    assert os.path.exists(os.path.join(output_include_dir, "converters", "enum_created.hpp"))
+    assert os.path.exists(os.path.join(output_include_dir, "converters", "enum_other.hpp"))
@@ -0,0 +1,25 @@
+import pytest
+
+from pipeline.profiling import Profiler, TraceEvent
+
+
+def test_self_time_of_nested_events():
+    profiler = Profiler()
+    # Events are added when they end, so nested ones are added first
+    profiler.add(TraceEvent("render", start=1.0, wall=1.0, cpu=1.0, pid=1, args={}))
+    profiler.add(TraceEvent("write", start=2.5, wall=0.5, cpu=0.5, pid=1, args={}))
+    profiler.add(TraceEvent("generate", start=1.0, wall=3.0, cpu=3.0, pid=1, args={}))
+    # Event of other process is not nested, even if it overlaps in time
+    profiler.add(TraceEvent("parse", start=1.5, wall=1.0, cpu=1.0, pid=2, args={}))
+
+    phases = profiler.self_phases()
+
+    assert phases["generate"].wall == pytest.approx(1.5)
+    assert phases["render"].wall == pytest.approx(1.0)
+    assert phases["write"].wall == pytest.approx(0.5)
+    assert phases["parse"].wall == pytest.approx(1.0)
+    # Inclusive times are kept
+    assert profiler.phases["generate"].wall == pytest.approx(3.0)
+
+    shares = [float(line.split()[2].rstrip("%")) for line in profiler.summary()[1:5]]
+    assert sum(shares) == pytest.approx(100.0, abs=0.2)